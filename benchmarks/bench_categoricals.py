@@ -0,0 +1,105 @@
+"""维度列字典编码对比：object 字符串列与共享分类字典的内存和耗时
+
+用法: python benchmarks/bench_categoricals.py [--customers 1000 10000] [--months 12] [--materials 30]
+
+process_data 产出的明细已按共享字典编码；对照组把同一份数据的维度列还原为 object 字符串，
+分别统计内存占用，以及分组汇总、合并、筛选和构建预聚合立方体的耗时，并校验两者结果一致。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import DIMENSION_COLUMNS, MaterialCube, generate_sample_data  # noqa: E402
+
+
+def to_object(df):
+    """把分类维度列还原为 object 字符串列"""
+    df = df.copy()
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(object)
+    return df
+
+
+def memory_mb(*frames):
+    return sum(df.memory_usage(deep=True).sum() for df in frames) / 1024 ** 2
+
+
+def timed(func, repeat=3):
+    """返回最快一次的耗时和结果"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def workload(material_data, sales_data):
+    """仪表板中的典型操作"""
+    regions = sorted(material_data['所属区域'].dropna().unique())[:3]
+    categories = sorted(material_data['物料类别'].dropna().unique())[:2]
+    return {
+        '分组汇总': lambda: material_data.groupby(['客户代码', '月份名'], observed=True)[
+            '物料成本'].sum().sort_index(),
+        '合并': lambda: pd.merge(
+            material_data.groupby(['客户代码', '月份名'], observed=True)['物料成本'].sum().sort_index().reset_index(),
+            sales_data.groupby(['客户代码', '月份名'], observed=True)['销售金额'].sum().sort_index().reset_index(),
+            on=['客户代码', '月份名']
+        ),
+        '筛选': lambda: material_data[
+            material_data['所属区域'].isin(regions).to_numpy() & material_data['物料类别'].isin(categories).to_numpy()
+        ],
+        '构建立方体': lambda: MaterialCube(material_data, sales_data).material
+    }
+
+
+def same_result(left, right):
+    """比较结果时忽略维度列的存储类型"""
+    if isinstance(left, pd.Series):
+        left, right = left.reset_index(), right.reset_index()
+    left, right = to_object(left).reset_index(drop=True), to_object(right).reset_index(drop=True)
+    return left.equals(right)
+
+
+def run(customer_counts, num_months, num_materials):
+    results = []
+    for num_customers in customer_counts:
+        material_data, sales_data, _, distributor_data = generate_sample_data(
+            num_customers=num_customers, num_months=num_months, num_materials=num_materials)
+        baseline = [to_object(df) for df in (material_data, sales_data, distributor_data)]
+
+        row = {
+            '经销商数': num_customers,
+            '物料明细行数': len(material_data),
+            'object内存(MB)': round(memory_mb(*baseline), 1),
+            '分类内存(MB)': round(memory_mb(material_data, sales_data, distributor_data), 1)
+        }
+        row['内存压缩比'] = round(row['object内存(MB)'] / row['分类内存(MB)'], 1)
+
+        encoded_ops = workload(material_data, sales_data)
+        object_ops = workload(baseline[0], baseline[1])
+        for name, encoded_op in encoded_ops.items():
+            object_seconds, object_result = timed(object_ops[name])
+            encoded_seconds, encoded_result = timed(encoded_op)
+            if not same_result(object_result, encoded_result):
+                raise AssertionError(f"{num_customers} 个经销商时「{name}」结果不一致")
+            row[f'{name}加速比'] = round(object_seconds / encoded_seconds, 1)
+        results.append(row)
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--materials', type=int, default=30)
+    args = parser.parse_args()
+    print(run(args.customers, args.months, args.materials).to_string(index=False))
@@ -0,0 +1,122 @@
+"""预测模型滚动起点回测：全国、各区域、各经销商月度序列的 MAPE / RMSE 与拟合耗时
+
+用法: python benchmarks/bench_forecast_backtest.py [--customers 2000] [--months 36] [--horizon 2] [--min-train 12]
+                                                   [--measure 销售金额] [--workers 4] [--output benchmarks/results/forecast_backtest.csv]
+
+对每个起点 t（t 从 --min-train 到 月份数-horizon），只用 t 之前的数据拟合 forecast_series，
+预测之后 horizon 个月并与实际值比较。各层级的序列按 --chunk-size 分块，与模型组合后在进程池中并行回测。
+结果追加写入 --output（CSV），每行带记录时间和代码版本，便于跨版本对比。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import FORECAST_MODELS, MaterialCube, forecast_series, generate_sample_data, monthly_panel  # noqa: E402
+
+LEVELS = {'全国': None, '区域': ['所属区域'], '经销商': ['客户代码']}
+
+
+def panel_values(cube, by, measure):
+    """取一个层级全部序列的 序列数 × 月份数 矩阵"""
+    _, _, cost, sales, _ = monthly_panel(cube, by)
+    if measure == '物料成本':
+        return cost
+    if measure == '销售金额':
+        return sales
+    return np.divide(sales, cost, out=np.full_like(sales, np.nan), where=cost > 0)
+
+
+def backtest_chunk(task):
+    """在一块序列上做滚动起点回测，返回误差累计量和拟合耗时"""
+    level, model, values, horizon, min_train = task
+    squared, count, abs_pct, pct_count, fit_seconds = 0.0, 0, 0.0, 0, 0.0
+    for origin in range(min_train, values.shape[1] - horizon + 1):
+        start = time.perf_counter()
+        _, forecast, _ = forecast_series(values[:, :origin], model=model, horizon=horizon)
+        fit_seconds += time.perf_counter() - start
+
+        actual = values[:, origin:origin + horizon]
+        errors = forecast - actual
+        valid = ~np.isnan(errors)
+        squared += float(np.sum(errors[valid] ** 2))
+        count += int(valid.sum())
+        nonzero = valid & (actual != 0)
+        abs_pct += float(np.sum(np.abs(errors[nonzero]) / np.abs(actual[nonzero])))
+        pct_count += int(nonzero.sum())
+    return level, model, values.shape[0], squared, count, abs_pct, pct_count, fit_seconds
+
+
+def code_version():
+    """当前代码版本（git 短哈希），不在 git 仓库中时返回空字符串"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(num_customers, num_months, horizon, min_train, measure, workers, chunk_size):
+    material_data, sales_data, _, _ = generate_sample_data(num_customers=num_customers, num_months=num_months)
+    cube = MaterialCube(material_data, sales_data)
+
+    tasks = []
+    for level, by in LEVELS.items():
+        values = panel_values(cube, by, measure)
+        for model in FORECAST_MODELS:
+            for start in range(0, len(values), chunk_size):
+                tasks.append((level, model, values[start:start + chunk_size], horizon, min_train))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = list(pool.map(backtest_chunk, tasks))
+    wall_seconds = time.perf_counter() - start
+
+    totals = pd.DataFrame(chunks, columns=['层级', '模型代码', '序列数', '平方误差和', '预测点数', '百分比误差和',
+                                           '百分比点数', '拟合耗时(秒)'])
+    totals = totals.groupby(['层级', '模型代码'], sort=False).sum().reset_index()
+    totals['模型'] = totals['模型代码'].map(FORECAST_MODELS)
+    totals['MAPE(%)'] = (totals['百分比误差和'] / totals['百分比点数'].where(totals['百分比点数'] > 0) * 100).round(2)
+    totals['RMSE'] = np.sqrt(totals['平方误差和'] / totals['预测点数'].where(totals['预测点数'] > 0)).round(4)
+    totals['拟合耗时(秒)'] = totals['拟合耗时(秒)'].round(4)
+
+    results = totals[['层级', '模型', '序列数', '预测点数', 'MAPE(%)', 'RMSE', '拟合耗时(秒)']].copy()
+    results.insert(0, '指标', measure)
+    results.insert(0, '预测月数', horizon)
+    results.insert(0, '经销商数', num_customers)
+    results.insert(0, '代码版本', code_version())
+    results.insert(0, '记录时间', pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return results, wall_seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, default=2_000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--horizon', type=int, default=2)
+    parser.add_argument('--min-train', type=int, default=12)
+    parser.add_argument('--measure', choices=['销售金额', '物料成本', 'ROI'], default='销售金额')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                                         'forecast_backtest.csv'))
+    args = parser.parse_args()
+
+    results, wall_seconds = run(args.customers, args.months, args.horizon, args.min_train, args.measure,
+                                args.workers, args.chunk_size)
+    print(results.drop(columns=['记录时间', '代码版本']).to_string(index=False))
+    print(f"并行回测总耗时: {wall_seconds:.2f} 秒（{args.workers} 个进程）")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        results.to_csv(args.output, mode='a', header=not os.path.exists(args.output), index=False,
+                       encoding='utf-8-sig')
+        print(f"结果已追加到 {args.output}")
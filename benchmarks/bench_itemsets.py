@@ -0,0 +1,71 @@
+"""高频产品组合挖掘性能：不同规模的经销商-月份篮子与产品目录
+
+用法: python benchmarks/bench_itemsets.py [--customers 2000 20000] [--months 36] [--materials 200 1000] [--min-support 0.0005]
+
+对每组规模生成示例数据，统计篮子数、稀疏 (篮子, 产品) 对数和挖掘耗时；
+同时用稠密指示矩阵的矩阵乘积校验二项组合的支持数与 ROI 合计。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import compute_product_bundles, generate_sample_data  # noqa: E402
+
+
+def dense_pairs(material_data, distributor_data):
+    """稠密 篮子 × 产品 指示矩阵上的二项组合支持数和ROI合计"""
+    baskets = material_data[['客户代码', '月份名', '产品代码']].drop_duplicates().astype(object)
+    indicator = pd.crosstab([baskets['客户代码'], baskets['月份名']], baskets['产品代码']).clip(upper=1)
+    roi = distributor_data.astype({'客户代码': object, '月份名': object}).set_index(
+        ['客户代码', '月份名'])['ROI'].reindex(indicator.index).fillna(0).to_numpy()
+    usage = indicator.to_numpy(dtype=float)
+    return indicator.columns, usage.T @ usage, usage.T @ (usage * roi[:, None])
+
+
+def run(customer_counts, num_months, material_counts, min_support):
+    results = []
+    for num_customers in customer_counts:
+        for num_materials in material_counts:
+            material_data, _, _, distributor_data = generate_sample_data(
+                num_customers=num_customers, num_months=num_months, num_materials=num_materials)
+
+            start = time.perf_counter()
+            bundles = compute_product_bundles(material_data, distributor_data, min_support=min_support)
+            seconds = time.perf_counter() - start
+
+            pairs = bundles[bundles['项数'] == 2]
+            if num_customers * num_materials <= 2_000_000:
+                codes, counts, roi_sums = dense_pairs(material_data, distributor_data)
+                position = {code: i for i, code in enumerate(codes)}
+                for items, support, mean_roi in zip(pairs['组合'], pairs['支持数'], pairs['平均ROI']):
+                    i, j = position[items[0]], position[items[1]]
+                    if counts[i, j] != support or not np.isclose(roi_sums[i, j] / support, mean_roi):
+                        raise AssertionError(f"{num_customers} 个经销商、{num_materials} 种产品时组合 {items} 统计不一致")
+
+            results.append({
+                '经销商数': num_customers,
+                '产品数': num_materials,
+                '篮子数': material_data[['客户代码', '月份名']].drop_duplicates().shape[0],
+                '篮子-产品对数': material_data[['客户代码', '月份名', '产品代码']].drop_duplicates().shape[0],
+                '频繁组合数': len(bundles),
+                '最大项数': int(bundles['项数'].max()) if len(bundles) else 0,
+                '挖掘耗时(秒)': round(seconds, 3)
+            })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[2_000, 20_000])
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--materials', type=int, nargs='+', default=[200, 1_000])
+    parser.add_argument('--min-support', type=float, default=0.0005)
+    args = parser.parse_args()
+    print(run(args.customers, args.months, args.materials, args.min_support).to_string(index=False))
@@ -0,0 +1,104 @@
+"""按月份分区筛选与全量位图筛选的耗时和内存对比
+
+用法: python benchmarks/bench_partitions.py [--customers 5000] [--months 12 36 60] [--repeat 20] [--max-mb 64]
+
+对每个历史月份数，用示例数据构建 DatasetStore 并写入增量分区存储，比较单月筛选（仪表盘的当月视图）
+在全量立方体上求位图、DatasetStore.select（内存中的月份分区）与在从存储加载的该月份分区上筛选的耗时，
+并校验三者的汇总指标一致；
+同时从增量分区存储按需加载全部月份，统计在 --max-mb 上限下常驻的月份数和内存占用。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import DatasetStore, generate_sample_data, select_facts  # noqa: E402
+from material_analytics.incremental import IncrementalStore  # noqa: E402
+
+DERIVED_COLUMNS = ['月份', '年份', '月份名', '季度', '月度名称']
+
+
+def raw_frame(df):
+    """示例数据去掉派生列、维度列转回字符串，还原为读取 Excel 后的原始明细"""
+    df = df.drop(columns=DERIVED_COLUMNS)
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def month_view(selections):
+    """当月视图用到的汇总：物料成本、销售金额、经销商数和经销商明细行数"""
+    material, sales, distributors = selections
+    return material.sum('物料成本'), sales.sum('销售金额'), sales.nunique('经销商名称'), len(distributors.frame)
+
+
+def run(num_customers, month_counts, repeat, max_mb):
+    results = []
+    for num_months in month_counts:
+        frames = generate_sample_data(num_customers=num_customers, num_months=num_months)
+        store = DatasetStore(*frames)
+        month = sorted(store.cube.material['月份名'].unique())[-1]
+        filters = {'月份名': [month], '所属区域': sorted(store.cube.material['所属区域'].unique())[:3]}
+
+        expected, full_seconds = timed(lambda: month_view(select_facts(
+            store.cube, store.distributor_data, store.distributor_index, filters)), repeat)
+
+        # DatasetStore.select 在内存中的月份分区上筛选（先加载一次分区）
+        store.select(filters)
+        in_memory, memory_seconds = timed(lambda: month_view(store.select(filters)), repeat)
+        if not np.allclose(expected, in_memory):
+            raise AssertionError(f"{num_months} 个月时内存分区筛选结果不一致: {expected} != {in_memory}")
+
+        with tempfile.TemporaryDirectory() as root:
+            material_data, sales_data, material_price, _ = frames
+            data_store = IncrementalStore(root)
+            data_store.append(raw_frame(material_data), raw_frame(sales_data), material_price)
+
+            partition = data_store.partitions().partition(month)
+            actual, partition_seconds = timed(lambda: month_view(partition.select(filters)), repeat)
+            if not np.allclose(expected, actual):
+                raise AssertionError(f"{num_months} 个月时分区筛选结果不一致: {expected} != {actual}")
+
+            # 从磁盘分区存储逐月按需加载，内存受上限约束
+            partitions = data_store.partitions(max_bytes=max_mb * 1024 ** 2)
+            start = time.perf_counter()
+            for stored_month in data_store.months:
+                partitions.partition(stored_month)
+            load_seconds = (time.perf_counter() - start) / len(data_store.months)
+            stats = partitions.stats()
+
+        results.append({
+            '月份数': num_months,
+            '物料行数': len(store.material_data),
+            '全量位图筛选(毫秒)': round(full_seconds * 1000, 2),
+            '内存分区筛选(毫秒)': round(memory_seconds * 1000, 2),
+            '分区筛选(毫秒)': round(partition_seconds * 1000, 2),
+            '加速比': round(full_seconds / partition_seconds, 1),
+            '全量数据(MB)': round(sum(df.memory_usage(deep=True).sum() for df in store.frames()) / 1024 ** 2, 1),
+            '单月加载(秒)': round(load_seconds, 3),
+            '常驻月份数': stats['常驻月份数'],
+            '分区内存(MB)': stats['内存占用(MB)']
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, default=5_000)
+    parser.add_argument('--months', type=int, nargs='+', default=[12, 36, 60])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-mb', type=int, default=64)
+    args = parser.parse_args()
+    print(run(args.customers, args.months, args.repeat, args.max_mb).to_string(index=False))
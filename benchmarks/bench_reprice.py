@@ -0,0 +1,89 @@
+"""单价修改后重算物料成本：全量重新处理与增量重算的耗时对比
+
+用法: python benchmarks/bench_reprice.py [--customers 2000] [--months 12 24 36]
+
+对每个历史月份数，把示例数据导入 IncrementalStore，然后给一个物料追加一条从最后一个月起生效的新单价，分别计时：
+全量 process_data（按新的单价历史重新匹配全部行）、只重算受影响行的 PriceHistory.apply，
+以及只改写受影响月份分区的 IncrementalStore.reprice；同时校验增量重算后的经销商数据与全量处理结果一致。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import PRICE_EFFECTIVE_COLUMN, PriceHistory, generate_sample_data, process_data  # noqa: E402
+from material_analytics.incremental import IncrementalStore  # noqa: E402
+
+DERIVED_COLUMNS = ['月份', '年份', '月份名', '季度', '月度名称']
+
+
+def raw_frames(num_customers, num_months):
+    """示例数据去掉派生列和已算好的单价、成本列，还原为读取 Excel 后的原始明细"""
+    material_data, sales_data, material_price, _ = generate_sample_data(num_customers=num_customers,
+                                                                        num_months=num_months)
+    material_data = material_data.drop(columns=['物料类别', '单价（元）', '物料成本'])
+    frames = []
+    for df in [material_data, sales_data]:
+        df = df.drop(columns=DERIVED_COLUMNS)
+        frames.append(df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}))
+    return frames[0], frames[1], material_price
+
+
+def price_edit(material_price, effective_month):
+    """给第一个物料追加一条从 effective_month 起生效、上涨 10% 的单价"""
+    edited = material_price.head(1).assign(**{'单价（元）': material_price['单价（元）'].iloc[0] * 1.1})
+    return pd.concat([material_price.assign(**{PRICE_EFFECTIVE_COLUMN: pd.NaT}),
+                      edited.assign(**{PRICE_EFFECTIVE_COLUMN: effective_month})], ignore_index=True)
+
+
+def run(num_customers, month_counts):
+    results = []
+    for num_months in month_counts:
+        material_data, sales_data, material_price = raw_frames(num_customers, num_months)
+        new_price = price_edit(material_price, material_data['发运月份'].max())
+
+        start = time.perf_counter()
+        expected_material, _, _, expected = process_data(material_data.copy(), sales_data.copy(), new_price.copy())
+        full_seconds = time.perf_counter() - start
+
+        # 内存中的物料明细：只重算受影响的行
+        priced, _, _, _ = process_data(material_data.copy(), sales_data.copy(), material_price.copy())
+        previous, prices = PriceHistory.from_table(material_price), PriceHistory.from_table(new_price)
+        start = time.perf_counter()
+        rows = prices.affected_rows(priced, previous)
+        prices.apply(priced, rows)
+        apply_seconds = time.perf_counter() - start
+        pd.testing.assert_series_equal(priced['物料成本'], expected_material['物料成本'])
+
+        with tempfile.TemporaryDirectory() as root:
+            store = IncrementalStore(root)
+            store.append(material_data, sales_data, material_price)
+            start = time.perf_counter()
+            report = store.reprice(new_price)
+            reprice_seconds = time.perf_counter() - start
+            pd.testing.assert_frame_equal(store.load()[3], expected)
+
+        results.append({
+            '月份数': num_months,
+            '物料行数': len(material_data),
+            '重算物料行数': report['重算物料行数'],
+            '全量处理(秒)': round(full_seconds, 3),
+            '内存增量重算(秒)': round(apply_seconds, 4),
+            '分区增量重算(秒)': round(reprice_seconds, 3),
+            '加速比': round(full_seconds / reprice_seconds, 1)
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--customers', type=int, default=2_000)
+    parser.add_argument('--months', type=int, nargs='+', default=[12, 24, 36])
+    args = parser.parse_args()
+    print(run(args.customers, args.months).to_string(index=False))
@@ -0,0 +1,92 @@
+"""客户价值分层性能对比：逐行 apply 与向量化分层
+
+用法: python benchmarks/bench_segmentation.py [--sizes 10000 100000 1000000]
+
+逐行实现对每一行重新计算全表分位数，整体为 O(n²)，在大规模数据上无法跑完。
+因此旧实现只对前 --legacy-rows 行计时（分位数仍基于全表计算，单行成本与全量一致），
+再按行数线性外推总耗时；同时校验这些行的分层结果与向量化实现完全一致。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import assign_value_segments  # noqa: E402
+
+
+def make_distributor_data(n_rows, seed=42):
+    """生成指定行数的经销商-月份数据"""
+    rng = np.random.default_rng(seed)
+    cost = rng.gamma(2.0, 5000.0, n_rows)
+    cost[rng.random(n_rows) < 0.05] = 0
+    sales = cost * rng.uniform(0.3, 3.5, n_rows)
+    roi = np.where(cost > 0, sales / np.where(cost > 0, cost, 1), 0)
+    return pd.DataFrame({
+        '月份名': rng.choice([f'2025-{m:02d}' for m in range(1, 13)], n_rows),
+        '所属区域': rng.choice(['华东', '华南', '华北', '华中', '西南', '西北', '东北'], n_rows),
+        '物料总成本': cost,
+        '销售总额': sales,
+        'ROI': roi
+    })
+
+
+def legacy_segments(distributor_data, n_rows):
+    """原 process_data 中的逐行分层实现，仅对前 n_rows 行执行"""
+
+    def value_segment(row):
+        if row['ROI'] >= 2.0 and row['销售总额'] > distributor_data['销售总额'].quantile(0.75):
+            return '高价值客户'
+        elif row['ROI'] >= 1.0 and row['销售总额'] > distributor_data['销售总额'].median():
+            return '成长型客户'
+        elif row['ROI'] >= 1.0:
+            return '稳定型客户'
+        else:
+            return '低效型客户'
+
+    return distributor_data.head(n_rows).apply(value_segment, axis=1)
+
+
+def run(sizes, legacy_rows):
+    results = []
+    for n_rows in sizes:
+        data = make_distributor_data(n_rows)
+
+        start = time.perf_counter()
+        vectorized = assign_value_segments(data)
+        vectorized_seconds = time.perf_counter() - start
+
+        sampled = min(legacy_rows, n_rows)
+        start = time.perf_counter()
+        legacy = legacy_segments(data, sampled)
+        legacy_seconds = (time.perf_counter() - start) * n_rows / sampled
+
+        if not (legacy == vectorized.head(sampled)).all():
+            raise AssertionError(f"{n_rows} 行时分层结果不一致")
+
+        start = time.perf_counter()
+        assign_value_segments(data, by=['月份名', '所属区域'])
+        grouped_seconds = time.perf_counter() - start
+
+        results.append({
+            '行数': n_rows,
+            '逐行apply(秒)': round(legacy_seconds, 3),
+            '是否外推': sampled < n_rows,
+            '向量化(秒)': round(vectorized_seconds, 4),
+            '按月份+区域(秒)': round(grouped_seconds, 4),
+            '加速比': round(legacy_seconds / vectorized_seconds, 1)
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-rows', type=int, default=2000)
+    args = parser.parse_args()
+    print(run(args.sizes, args.legacy_rows).to_string(index=False))
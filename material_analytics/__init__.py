@@ -0,0 +1,62 @@
+"""物料分析核心计算包
+
+只依赖 pandas 和 NumPy，不导入 Streamlit、没有界面副作用，可直接用于批处理任务和脚本；
+物料分析.py 中的仪表盘只负责筛选、缓存和绘图。
+"""
+
+from .loading import (
+    DATA_LOAD_TIMINGS, DATA_WORKBOOKS, EXCEL_BLOCK_ROWS, EXCEL_CACHE_DIR, generate_sample_data, load_data,
+    normalize_price_columns, read_excel_cached, read_excel_streaming, read_workbooks
+)
+from .processing import (
+    DIMENSION_COLUMNS, add_customer_regions, add_date_columns, aggregate_distributors, assign_value_segments,
+    build_dimension_dtypes, compute_material_diversity, encode_dimensions, prepare_material, prepare_sales,
+    process_data
+)
+from .pricing import PRICE_EFFECTIVE_COLUMN, PriceHistory, month_ordinals
+from .store import (
+    PARTITION_CACHE_MAX_BYTES, RESULT_CACHE_MAX_BYTES, DatasetStore, DistributorIndex, FilterIndex, LazySelection,
+    MaterialCube, MonthPartition, PartitionedDataset, ResultCache, SalesAttribution, freeze_frame, select_facts
+)
+from .metrics import (
+    SALES_SCALE_LABELS, SCALE_DIVERSITY_TARGETS, compute_category_cost, compute_category_roi, compute_category_share,
+    compute_distributor_monthly, compute_diversity_metrics, compute_efficiency_group_mix, compute_kpis,
+    compute_lag_effects, compute_material_combinations, compute_material_roi, compute_monthly_sales,
+    compute_product_bundles, compute_product_material_affinity, compute_region_cost_ratio, compute_scale_diversity,
+    compute_segment_counts, compute_segment_efficiency, compute_segment_sales, cooccurrence_itemsets, cross_counts,
+    distributor_item_pairs, lagged_effect_series, mine_frequent_itemsets, monthly_panel, optimal_diversity,
+    top_affinity_matrix
+)
+from .recommendations import (
+    get_customer_optimization_suggestions, get_material_combination_recommendations, high_roi_category_shares
+)
+from .forecasting import (
+    FORECAST_MODELS, SeriesForecast, batched_polyfit, batched_polyval, compute_forecasts, forecast_series
+)
+from .incremental import IncrementalStore
+from .precompute import (
+    PRECOMPUTED_METRICS, PRECOMPUTED_SLICE_DIMENSIONS, PrecomputedResults, dataset_signature, precompute
+)
+
+__all__ = [
+    'DATA_LOAD_TIMINGS', 'DATA_WORKBOOKS', 'EXCEL_BLOCK_ROWS', 'EXCEL_CACHE_DIR', 'generate_sample_data', 'load_data',
+    'normalize_price_columns', 'read_excel_cached', 'read_excel_streaming', 'read_workbooks',
+    'DIMENSION_COLUMNS', 'add_customer_regions', 'add_date_columns', 'aggregate_distributors', 'assign_value_segments',
+    'build_dimension_dtypes', 'compute_material_diversity', 'encode_dimensions', 'prepare_material', 'prepare_sales',
+    'process_data',
+    'PRICE_EFFECTIVE_COLUMN', 'PriceHistory', 'month_ordinals',
+    'PARTITION_CACHE_MAX_BYTES', 'RESULT_CACHE_MAX_BYTES', 'DatasetStore', 'DistributorIndex', 'FilterIndex',
+    'LazySelection', 'MaterialCube', 'MonthPartition', 'PartitionedDataset', 'ResultCache', 'SalesAttribution',
+    'freeze_frame', 'select_facts',
+    'SALES_SCALE_LABELS', 'SCALE_DIVERSITY_TARGETS', 'compute_category_cost', 'compute_category_roi',
+    'compute_category_share', 'compute_distributor_monthly', 'compute_diversity_metrics',
+    'compute_efficiency_group_mix', 'compute_kpis', 'compute_lag_effects', 'compute_material_combinations',
+    'compute_material_roi', 'compute_monthly_sales', 'compute_product_bundles', 'compute_product_material_affinity',
+    'compute_region_cost_ratio', 'compute_scale_diversity', 'compute_segment_counts', 'compute_segment_efficiency',
+    'compute_segment_sales', 'cooccurrence_itemsets', 'cross_counts', 'distributor_item_pairs',
+    'lagged_effect_series', 'mine_frequent_itemsets', 'monthly_panel', 'optimal_diversity', 'top_affinity_matrix',
+    'get_customer_optimization_suggestions', 'get_material_combination_recommendations', 'high_roi_category_shares',
+    'FORECAST_MODELS', 'SeriesForecast', 'batched_polyfit', 'batched_polyval', 'compute_forecasts', 'forecast_series',
+    'IncrementalStore',
+    'PRECOMPUTED_METRICS', 'PRECOMPUTED_SLICE_DIMENSIONS', 'PrecomputedResults', 'dataset_signature', 'precompute',
+]
@@ -0,0 +1,140 @@
+"""月度序列批量预测"""
+
+import numpy as np
+import pandas as pd
+
+from .metrics import monthly_panel
+
+
+# 预测模型（键为模型代码，值为界面显示名称）
+FORECAST_MODELS = {
+    'linear': '线性趋势',
+    'quadratic': '二次趋势',
+    'seasonal_naive': '季节性朴素',
+    'exp_smoothing': '指数平滑'
+}
+
+
+def batched_polyfit(x, Y, degree):
+    """对多条序列同时做多项式最小二乘拟合
+
+    x: 长度为 T 的自变量（各序列共用）；Y: 序列数 × T 的因变量，NaN 视为缺失
+    每条序列的法方程 VᵀWV·c = VᵀWy 堆叠为 (序列数, degree+1, degree+1) 后一次求解，
+    W 为该序列的有效值位图；有效点不足时用伪逆给出最小范数解。
+    返回 序列数 × (degree+1) 的系数矩阵，与 np.polyfit 相同按最高次项在前排列
+    """
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    V = np.vander(x, degree + 1)
+    W = ~np.isnan(Y)
+    gram = np.einsum('st,tp,tq->spq', W.astype(np.float64), V, V)
+    moments = np.einsum('st,tp->sp', np.where(W, Y, 0.0), V)
+    return np.einsum('spq,sq->sp', np.linalg.pinv(gram), moments)
+
+
+def batched_polyval(coefficients, x):
+    """按系数矩阵逐序列求多项式值，返回 序列数 × len(x)"""
+    return coefficients @ np.vander(np.asarray(x, dtype=np.float64), coefficients.shape[1]).T
+
+
+def forecast_series(values, model='quadratic', horizon=2, season_length=12, alphas=np.linspace(0.1, 0.9, 9)):
+    """对 序列数 × 月份数 的矩阵批量拟合并外推 horizon 个月
+
+    linear / quadratic: 按月份序号的一次 / 二次趋势（batched_polyfit）
+    seasonal_naive: 预测值取上一季节周期同月的值，历史不足一个周期时以全部历史为周期
+    exp_smoothing: 简单指数平滑，平滑系数在 alphas 中按一步预测误差平方和逐序列选取，所有序列和候选系数同时递推
+    返回 (拟合值矩阵, 预测值矩阵, 系数矩阵)；系数对趋势模型为多项式系数，对指数平滑为平滑系数，季节性朴素为 None
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_series, n_months = values.shape
+    steps = np.arange(n_months)
+    future = np.arange(n_months, n_months + horizon)
+
+    if model in ('linear', 'quadratic'):
+        coefficients = batched_polyfit(steps, values, 1 if model == 'linear' else 2)
+        return batched_polyval(coefficients, steps), batched_polyval(coefficients, future), coefficients
+
+    if model == 'seasonal_naive':
+        period = max(1, min(season_length, n_months))
+        fitted = np.full_like(values, np.nan)
+        fitted[:, period:] = values[:, :n_months - period]
+        forecast = values[:, n_months - period + (np.arange(horizon) % period)] if n_months else \
+            np.full((n_series, horizon), np.nan)
+        return fitted, forecast, None
+
+    if model == 'exp_smoothing':
+        alphas = np.asarray(alphas, dtype=np.float64)
+        # 状态维度：序列 × 候选平滑系数；缺失月份不更新水平
+        level = np.full((n_series, len(alphas)), np.nan)
+        fitted = np.full((n_series, len(alphas), n_months), np.nan)
+        for t in range(n_months):
+            fitted[:, :, t] = level
+            observed = values[:, [t]]
+            has_value = ~np.isnan(observed)
+            updated = np.where(np.isnan(level), observed, alphas[None, :] * observed + (1 - alphas[None, :]) * level)
+            level = np.where(has_value, updated, level)
+        errors = np.nansum((fitted - values[:, None, :]) ** 2, axis=2)
+        best = np.argmin(errors, axis=1)
+        rows = np.arange(n_series)
+        forecast = np.repeat(level[rows, best][:, None], horizon, axis=1)
+        return fitted[rows, best], forecast, alphas[best][:, None]
+
+    raise ValueError(f"未知的预测模型: {model}")
+
+
+class SeriesForecast:
+    """一组月度序列的批量预测结果
+
+    segments 为各序列的分组取值，actual / fitted 为 序列数 × 历史月份数，forecast 为 序列数 × 预测月数。
+    图表函数只读取这里的结果，不再自行拟合。
+    """
+
+    def __init__(self, segments, months, actual, fitted, forecast, coefficients, model):
+        self.segments = segments
+        self.months = months
+        self.actual = actual
+        self.fitted = fitted
+        self.forecast = forecast
+        self.coefficients = coefficients
+        self.model = model
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __sizeof__(self):
+        arrays = [self.actual, self.fitted, self.forecast] + ([self.coefficients] if self.coefficients is not None else [])
+        return int(sum(array.nbytes for array in arrays) + self.segments.memory_usage(deep=True).sum())
+
+    @property
+    def future_months(self):
+        return pd.period_range(self.months[-1] + 1, periods=self.forecast.shape[1], freq='M') \
+            if len(self.months) else pd.PeriodIndex([], freq='M')
+
+    def locate(self, **values):
+        """按分组取值查找序列位置，找不到时返回 None"""
+        mask = np.ones(len(self.segments), dtype=bool)
+        for col, value in values.items():
+            mask &= (self.segments[col].astype(object) == value).to_numpy()
+        found = np.flatnonzero(mask)
+        return int(found[0]) if len(found) else None
+
+
+def compute_forecasts(cube, by=None, measure='销售金额', model='quadratic', horizon=2, filters=None):
+    """按分组批量预测月度指标
+
+    by: 分组维度列表（客户代码、所属区域、物料类别等），为空时为全国汇总
+    measure: 物料成本、销售金额或ROI（销售金额 ÷ 物料成本，物料成本为0的月份视为缺失）
+    所有分组的月度序列由 monthly_panel 堆叠为矩阵后一次拟合。
+    """
+    segments, months, cost, sales, _ = monthly_panel(cube, by, filters)
+    if measure == '物料成本':
+        values = cost
+    elif measure == '销售金额':
+        values = sales
+    elif measure == 'ROI':
+        values = np.divide(sales, cost, out=np.full_like(sales, np.nan), where=cost > 0)
+    else:
+        raise ValueError(f"未知的预测指标: {measure}")
+
+    fitted, forecast, coefficients = forecast_series(values, model=model, horizon=horizon)
+    return SeriesForecast(segments, months, values, fitted, forecast, coefficients, model)
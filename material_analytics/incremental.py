@@ -0,0 +1,333 @@
+"""增量月度导入：按月份分区持久化已处理数据，新数据只重算受影响的月份
+
+用法: python -m material_analytics.incremental --store data_store --material 新增物料.xlsx --sales 新增销售.xlsx
+                                               [--price 物料单价.xlsx]
+      python -m material_analytics.incremental --store data_store --price 物料单价.xlsx   （只更新单价表并重算物料成本）
+
+目录结构（每个分区一个 Parquet 文件，维度列以字符串存储，读取时统一编码）：
+    material/月份名=<月份>/part-0.parquet      已计算日期列和物料成本的物料明细
+    sales/月份名=<月份>/part-0.parquet         已计算日期列和销售金额的销售明细
+    distributor/月份名=<月份>/part-0.parquet   经销商月度汇总（不含区域、省份和客户价值分层）
+    summary.parquet                            各月经销商销售总额（月份名、销售总额），用于更新分层阈值
+    customers.parquet                          客户代码与区域、省份的对应关系
+    dimensions.json                            维度列的共享分类字典（全部已导入月份的取值）
+    material_price.parquet                     当前的物料单价表（可带生效月份列）
+    manifest.json                              已导入月份、各分区行数和客户价值分层阈值
+
+导入新数据时只读写新数据涉及的月份分区；已导入月份再次导入时替换该月份的行，重复导入同一文件不会使数据翻倍。
+分层阈值由销售总额汇总求得（只替换受影响月份的汇总行，不读取其他月份的分区），客户价值分层、区域和省份在读取时
+按阈值和对应关系补齐，已导入月份的分区不需要改写。物料成本按导入时的物料单价表计算；单价表修改后用 reprice 更新，
+只改写单价有变化的物料所在月份的分区，分区内也只重算这些行。
+读取部分月份时也使用全量的分类字典，按月份分别读取的分区之间编码一致，可作为 PartitionedDataset 的数据来源。
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .loading import normalize_price_columns, read_excel_streaming
+from .pricing import PriceHistory, month_ordinals
+from .processing import (
+    DIMENSION_COLUMNS, add_customer_regions, aggregate_distributors, assign_value_segments, build_dimension_dtypes,
+    compute_material_diversity, encode_dimensions, prepare_material, prepare_sales
+)
+from .store import PARTITION_CACHE_MAX_BYTES, PartitionedDataset
+
+# 经销商数据的列顺序（与 process_data 的结果一致）
+DISTRIBUTOR_COLUMNS = ['客户代码', '经销商名称', '月份名', '销售人员', '物料总成本', '销售总额', 'ROI', '物料销售比率',
+                       '所属区域', '省份', '客户价值分层', '物料多样性']
+
+
+def _write_parquet(df, path):
+    """先写临时文件再替换，中断时不会留下写了一半的分区"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+
+def _decode_dimensions(df):
+    """分类维度列转回字符串，各分区的分类字典不同，统一在读取时编码"""
+    return df.astype({col: object for col in DIMENSION_COLUMNS
+                      if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def merge_dictionaries(dictionaries, *frames):
+    """把新数据中维度列的取值并入已有的分类字典（{维度列: 取值列表}），与 build_dimension_dtypes 一样排序"""
+    merged = {}
+    for col, dtype in build_dimension_dtypes(*frames).items():
+        values = pd.Index(list(dictionaries.get(col, [])) + dtype.categories.tolist()).unique()
+        try:
+            values = values.sort_values()
+        except TypeError:
+            pass
+        merged[col] = values.tolist()
+    return {**dictionaries, **merged}
+
+
+def segment_thresholds(sales_runs):
+    """由各月销售总额汇总求全量客户价值分层阈值 (75分位数, 中位数)，与 assign_value_segments 的全量阈值一致"""
+    sales = np.concatenate(sales_runs) if sales_runs else np.array([], dtype=float)
+    if len(sales) == 0:
+        return np.nan, np.nan
+    upper, median = np.quantile(sales, [0.75, 0.5])
+    return float(upper), float(median)
+
+
+def _unpriced_rows(material_data):
+    """单价表中没有匹配到单价（按平均单价填充）的物料行数"""
+    return int(material_data['物料代码'].isna().sum()) if '物料代码' in material_data.columns else 0
+
+
+def summarize_month(material_data, sales_data):
+    """一个月份的经销商汇总
+
+    material_data / sales_data: 该月份已处理的物料和销售明细
+    """
+    dtypes = build_dimension_dtypes(material_data, sales_data)
+    material_data = encode_dimensions(material_data.copy(deep=False), dtypes)
+    sales_data = encode_dimensions(sales_data.copy(deep=False), dtypes)
+
+    distributor_data = pd.merge(
+        aggregate_distributors(material_data, sales_data),
+        compute_material_diversity(material_data),
+        on=['客户代码', '月份名'],
+        how='left'
+    )
+    distributor_data['物料多样性'].fillna(0, inplace=True)
+    return _decode_dimensions(distributor_data)
+
+
+class IncrementalStore:
+    """按月份分区持久化的已处理数据
+
+    append 导入新的物料和销售明细，只重算新数据涉及的月份；load 读取全部或部分月份，
+    返回与 process_data 结构相同的 (物料数据, 销售数据, 物料单价, 经销商数据)。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        try:
+            with open(os.path.join(root, 'manifest.json'), encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {'months': {}, 'thresholds': [None, None]}
+
+    @property
+    def months(self):
+        return sorted(self.manifest['months'])
+
+    def partition_path(self, table, month):
+        return os.path.join(self.root, table, f"月份名={month}", 'part-0.parquet')
+
+    def read_partition(self, table, month, columns=None):
+        """读取一个月份分区，分区不存在时返回 None"""
+        path = self.partition_path(table, month)
+        return pd.read_parquet(path, columns=columns) if os.path.exists(path) else None
+
+    def _write_json(self, name, payload):
+        path = os.path.join(self.root, name)
+        os.makedirs(self.root, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    def dictionaries(self):
+        """维度列的共享分类字典 {维度列: 取值列表}"""
+        try:
+            with open(os.path.join(self.root, 'dimensions.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update_thresholds(self, totals):
+        """替换若干月份的销售总额汇总并重算全量分层阈值
+
+        totals: {月份: 该月各经销商的销售总额}；汇总保存在一个文件中，其他月份的汇总行保持不变
+        """
+        path = os.path.join(self.root, 'summary.parquet')
+        summary = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(
+            {'月份名': pd.Series(dtype=object), '销售总额': pd.Series(dtype=float)})
+        summary = pd.concat([summary[~summary['月份名'].isin(list(totals))]] + [
+            pd.DataFrame({'月份名': month, '销售总额': np.asarray(values, dtype=float)})
+            for month, values in totals.items()
+        ], ignore_index=True)
+        _write_parquet(summary, path)
+        self.manifest['thresholds'] = list(segment_thresholds([summary['销售总额'].to_numpy()]))
+
+    def append(self, material_data, sales_data, material_price=None):
+        """导入新的物料和销售明细（原始列，同 load_data 读取的 Excel），返回本次导入的统计
+
+        新数据可以是新月份，也可以是已导入月份的数据：某月份在新数据的物料（销售）明细中出现时，
+        替换该月份已有的物料（销售）行，新数据中没有的表保留原有分区。只有新数据涉及的月份分区被改写并重算汇总。
+        material_price: 物料单价表，不给出时使用上次导入的单价表（首次导入必须给出）
+        """
+        start = time.perf_counter()
+        price_path = os.path.join(self.root, 'material_price.parquet')
+        if material_price is None:
+            if not os.path.exists(price_path):
+                raise ValueError(f"存储 {self.root} 中还没有物料单价表，首次导入需要给出物料单价表")
+            material_price = pd.read_parquet(price_path)
+        else:
+            material_price = normalize_price_columns(material_price)
+            _write_parquet(material_price, price_path)
+
+        material_data = _decode_dimensions(prepare_material(material_data.copy(), material_price))
+        sales_data = _decode_dimensions(prepare_sales(sales_data.copy()))
+
+        affected = sorted(set(material_data['月份名'].dropna()) | set(sales_data['月份名'].dropna()))
+        material_groups = dict(tuple(material_data.groupby('月份名', sort=False)))
+        sales_groups = dict(tuple(sales_data.groupby('月份名', sort=False)))
+        totals = {}
+        for month in affected:
+            frames = {}
+            for table, groups, template in [('material', material_groups, material_data),
+                                            ('sales', sales_groups, sales_data)]:
+                if month in groups:
+                    frames[table] = groups[month].reset_index(drop=True)
+                    _write_parquet(frames[table], self.partition_path(table, month))
+                else:
+                    frames[table] = self.read_partition(table, month)
+                    if frames[table] is None:
+                        frames[table] = template.iloc[0:0]
+                        _write_parquet(frames[table], self.partition_path(table, month))
+
+            distributor_data = summarize_month(frames['material'], frames['sales'])
+            _write_parquet(distributor_data, self.partition_path('distributor', month))
+            totals[month] = distributor_data['销售总额'].to_numpy()
+            self.manifest['months'][month] = {
+                'material': len(frames['material']),
+                'sales': len(frames['sales']),
+                'distributor': len(distributor_data),
+                'unpriced': _unpriced_rows(frames['material'])
+            }
+
+        # 共享分类字典
+        self._write_json('dimensions.json', merge_dictionaries(self.dictionaries(), material_data, sales_data))
+
+        # 客户代码与区域、省份的对应关系
+        customers_path = os.path.join(self.root, 'customers.parquet')
+        customers = material_data[['客户代码', '所属区域', '省份']]
+        if os.path.exists(customers_path):
+            customers = pd.concat([pd.read_parquet(customers_path), customers], ignore_index=True)
+        _write_parquet(customers.drop_duplicates(ignore_index=True), customers_path)
+
+        # 全量分层阈值：只替换受影响月份的销售总额汇总
+        self.update_thresholds(totals)
+        self.manifest['updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._write_json('manifest.json', self.manifest)
+
+        return {
+            '新增物料行数': len(material_data),
+            '新增销售行数': len(sales_data),
+            '重算月份': affected,
+            '已导入月份数': len(self.months),
+            '耗时(秒)': round(time.perf_counter() - start, 3)
+        }
+
+    def reprice(self, material_price):
+        """更新物料单价表并重算受影响的物料成本，返回本次重算的统计
+
+        新旧单价表的差异给出每个物料单价变化的起始月份，只读取起始月份及之后的物料分区，
+        分区内只重算受影响的行，再重算这些月份的经销商汇总和全量分层阈值。
+        """
+        start = time.perf_counter()
+        price_path = os.path.join(self.root, 'material_price.parquet')
+        previous = PriceHistory.from_table(pd.read_parquet(price_path))
+        material_price = normalize_price_columns(material_price)
+        prices = PriceHistory.from_table(material_price)
+
+        changes = prices.changed_materials(previous)
+        first_month = min(changes.values(), default=None)
+        mean_changed = not np.isclose(prices.mean_price, previous.mean_price, equal_nan=True)
+
+        repriced_rows, repriced_months, totals = 0, [], {}
+        for month, counts in sorted(self.manifest['months'].items()):
+            # 只读取单价变化起始月份之后的分区；平均单价变化时还要读取有未匹配单价行的分区
+            changed = first_month is not None and month_ordinals([month])[0] >= first_month
+            if not (changed or (mean_changed and counts.get('unpriced', 1) > 0)):
+                continue
+            material_data = self.read_partition('material', month)
+            rows = prices.affected_rows(material_data, previous, changes)
+            if len(rows) == 0:
+                continue
+            prices.apply(material_data, rows)
+            _write_parquet(material_data, self.partition_path('material', month))
+
+            distributor_data = summarize_month(material_data, self.read_partition('sales', month))
+            _write_parquet(distributor_data, self.partition_path('distributor', month))
+            totals[month] = distributor_data['销售总额'].to_numpy()
+            counts.update(distributor=len(distributor_data), unpriced=_unpriced_rows(material_data))
+            repriced_rows += len(rows)
+            repriced_months.append(month)
+
+        _write_parquet(material_price, price_path)
+        if totals:
+            self.update_thresholds(totals)
+        self.manifest['updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._write_json('manifest.json', self.manifest)
+
+        return {
+            '单价变化物料数': len(changes),
+            '重算物料行数': repriced_rows,
+            '重算月份': repriced_months,
+            '耗时(秒)': round(time.perf_counter() - start, 3)
+        }
+
+    def load(self, months=None):
+        """读取已导入的数据，返回 (物料数据, 销售数据, 物料单价, 经销商数据)
+
+        months: 只读取这些月份的分区，默认全部；客户价值分层始终使用全量阈值
+        """
+        months = self.months if months is None else [month for month in months if month in self.manifest['months']]
+        tables = {
+            table: pd.concat([self.read_partition(table, month) for month in months], ignore_index=True)
+            for table in ['material', 'sales', 'distributor']
+        }
+        material_data, sales_data = tables['material'], tables['sales']
+        material_price = pd.read_parquet(os.path.join(self.root, 'material_price.parquet'))
+        customers = pd.read_parquet(os.path.join(self.root, 'customers.parquet'))
+
+        dimension_dtypes = {col: pd.CategoricalDtype(values) for col, values in self.dictionaries().items()}
+        for df in [material_data, sales_data]:
+            encode_dimensions(df, dimension_dtypes)
+
+        # 各月份分区合并后按经销商和月份排序，与全量处理的行顺序一致
+        distributor_data = encode_dimensions(tables['distributor'], dimension_dtypes).sort_values(
+            ['客户代码', '经销商名称', '月份名', '销售人员'], kind='stable', ignore_index=True)
+        distributor_data = add_customer_regions(distributor_data, customers)
+        distributor_data['客户价值分层'] = assign_value_segments(distributor_data,
+                                                          thresholds=self.manifest['thresholds'])
+        distributor_data = encode_dimensions(distributor_data[DISTRIBUTOR_COLUMNS], dimension_dtypes)
+        return material_data, sales_data, material_price, distributor_data
+
+    def partitions(self, max_bytes=PARTITION_CACHE_MAX_BYTES):
+        """以本存储为数据来源的月份分区集合，月份分区在首次访问时才从磁盘读取"""
+        def loader(month):
+            material_data, sales_data, _, distributor_data = self.load(months=[month])
+            return material_data, sales_data, distributor_data
+
+        return PartitionedDataset(self.months, loader, max_bytes)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', default='data_store')
+    parser.add_argument('--material')
+    parser.add_argument('--sales')
+    parser.add_argument('--price')
+    args = parser.parse_args()
+
+    store = IncrementalStore(args.store)
+    if args.material and args.sales:
+        report = store.append(read_excel_streaming(args.material), read_excel_streaming(args.sales),
+                              read_excel_streaming(args.price) if args.price else None)
+    elif args.price and not (args.material or args.sales):
+        report = store.reprice(read_excel_streaming(args.price))
+    else:
+        parser.error('需要同时给出 --material 和 --sales，或只给出 --price')
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,452 @@
+"""数据加载：Excel 流式读取、列式缓存与示例数据生成"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from .processing import process_data
+
+
+# Excel列式缓存目录（每个工作簿对应一个Parquet文件和一个元数据文件）
+EXCEL_CACHE_DIR = ".excel_cache"
+
+
+# 数据加载耗时记录，键为文件路径；并行或串行读取多个工作簿时另记一行 '合计'（总墙钟耗时）
+DATA_LOAD_TIMINGS = {}
+
+# 流式读取Excel时每次转换为列数组的行数
+EXCEL_BLOCK_ROWS = 10_000
+
+# load_data 读取的工作簿（物料明细、销售明细、物料单价）
+# 注意：GitHub部署时请修改为正确的文件路径
+DATA_WORKBOOKS = ["2025物料源数据.xlsx", "25物料源销售数据.xlsx", "物料单价.xlsx"]
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    """分块计算文件内容的SHA256哈希"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _excel_cache_paths(path, cache_dir):
+    """返回工作簿对应的缓存文件和元数据文件路径"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    path_key = hashlib.md5(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]
+    base = os.path.join(cache_dir, f"{stem}-{path_key}")
+    return base + '.parquet', base + '.meta.json'
+
+
+def _write_cache_meta(meta_file, meta):
+    """原子写入缓存元数据"""
+    tmp_file = meta_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_file, meta_file)
+
+
+def _read_cache_meta(cache_file, meta_file):
+    """读取缓存元数据，缓存文件或元数据缺失、损坏时返回 None"""
+    if not (os.path.exists(cache_file) and os.path.exists(meta_file)):
+        return None
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_is_fresh(path, cache_dir, read_kwargs):
+    """缓存的大小、修改时间和读取参数与工作簿一致（不计算哈希，用于判断是否需要解析Excel）"""
+    stat = os.stat(path)
+    meta = _read_cache_meta(*_excel_cache_paths(path, cache_dir))
+    return (meta is not None and meta.get('size') == stat.st_size and meta.get('mtime_ns') == stat.st_mtime_ns
+            and meta.get('read_kwargs') == repr(read_kwargs))
+
+
+def _header_names(header):
+    """表头单元格转为列名：空表头记为 Unnamed: <列号>，重复列名依次加 .1、.2 后缀（与 pd.read_excel 一致）"""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _block_columns(rows, width):
+    """一个行块转为各列的数组：只含数值和空值的列为 float64 数组（空值为 NaN），
+    含文本、日期、布尔等其他取值的列保留为对象数组，读完全部行块后再整列推断类型"""
+    columns = []
+    for values in (zip(*rows) if rows else [()] * width):
+        if all(value is None or type(value) in (int, float) for value in values):
+            columns.append(np.array([np.nan if value is None else value for value in values], dtype=np.float64))
+        else:
+            columns.append(np.array(values, dtype=object))
+    return columns
+
+
+def _infer_column(name, chunks):
+    """拼接一列的各行块并按 pd.read_excel 的规则推断类型
+
+    数值列：没有空值且都是整数值时为 int64，否则为 float64（Excel 不区分整数和浮点，与 pd.read_excel 一致）。
+    其他列交给 pd.read_excel 同样使用的 TextParser 整列推断：可转为数值的文本（如 '001'）转为数值，
+    默认缺失值标记（如 'NA'、'N/A'）记为缺失，日期列为 datetime64，其余为对象列。
+    """
+    if not chunks:
+        # 只有表头的工作表：与 pd.read_excel 一样为空的对象列
+        return pd.Series([], dtype=object)
+    if all(chunk.dtype == np.float64 for chunk in chunks):
+        values = np.concatenate(chunks)
+        if len(values) and not np.isnan(values).any() and (values % 1 == 0).all():
+            values = values.astype(np.int64)
+        return pd.Series(values)
+
+    parts = []
+    for chunk in chunks:
+        if chunk.dtype == np.float64:
+            # 数值行块还原为单元格取值：整数值为 int，空值为 None
+            part = chunk.astype(object)
+            whole = ~np.isnan(chunk) & (chunk % 1 == 0)
+            part[whole] = [int(value) for value in chunk[whole]]
+            part[np.isnan(chunk)] = None
+            chunk = part
+        parts.append(chunk)
+    values = np.concatenate(parts)
+    del parts
+    rows = [['' if value is None else value] for value in values]
+    return TextParser(rows, names=[name], header=None, skip_blank_lines=False).read()[name]
+
+
+def read_excel_streaming(path, sheet_name=0, block_rows=EXCEL_BLOCK_ROWS):
+    """以只读模式流式读取工作表，结果与 pd.read_excel(path, sheet_name) 一致，峰值内存接近最终 DataFrame 的大小
+
+    pd.read_excel 先把整个工作表载入 openpyxl 的单元格对象，再构建 DataFrame；这里用 read_only 模式逐行读取，
+    每 block_rows 行转换为列数组后丢弃行对象，最后逐列拼接并推断类型（拼接完一列即释放该列的分块）。
+    第一行为表头；与 pd.read_excel 一样保留数据中间的全空行（各列为空值），去掉末尾的全空行。
+    列类型的推断规则见 _infer_column；只含数值的列在读取时就存为 float64 数组，
+    含文本或日期的列在整列推断前以对象数组暂存。
+    sheet_name: 工作表名称或序号
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if isinstance(sheet_name, str) else workbook.worksheets[sheet_name]
+        rows = worksheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        width = len(header)
+        padding = (None,) * width
+
+        chunks = [[] for _ in range(width)]
+        block = []
+        blank_rows = 0
+        for row in rows:
+            row = (row + padding)[:width]
+            if all(value is None for value in row):
+                # 全空行先计数，之后出现非空行时才写入（末尾的全空行丢弃）
+                blank_rows += 1
+                continue
+            block.extend([padding] * blank_rows)
+            blank_rows = 0
+            block.append(row)
+            if len(block) >= block_rows:
+                for chunk, values in zip(chunks, _block_columns(block, width)):
+                    chunk.append(values)
+                block = []
+        if block:
+            for chunk, values in zip(chunks, _block_columns(block, width)):
+                chunk.append(values)
+        del block
+    finally:
+        workbook.close()
+
+    data = {}
+    for name, chunk in zip(_header_names(header), chunks):
+        data[name] = _infer_column(name, chunk)
+        chunk.clear()
+    return pd.DataFrame(data, columns=_header_names(header))
+
+
+def read_excel_cached(path, cache_dir=EXCEL_CACHE_DIR, **read_kwargs):
+    """读取Excel工作簿，优先使用列式(Parquet)缓存
+
+    缓存以文件大小、修改时间和内容哈希为键：大小与修改时间一致时直接读取缓存；
+    修改时间变化但内容哈希一致时复用缓存并刷新元数据；否则用 read_excel_streaming 重新解析Excel并重建缓存。
+    每次读取的来源和耗时记录在 DATA_LOAD_TIMINGS 中。
+    read_kwargs: 传给 read_excel_streaming 的参数（sheet_name、block_rows）
+    """
+    start = time.perf_counter()
+    stat = os.stat(path)
+    cache_file, meta_file = _excel_cache_paths(path, cache_dir)
+    meta = _read_cache_meta(cache_file, meta_file)
+
+    content_hash = None
+    cache_valid = False
+    if meta is not None and meta.get('size') == stat.st_size and meta.get('read_kwargs') == repr(read_kwargs):
+        if meta.get('mtime_ns') == stat.st_mtime_ns:
+            cache_valid = True
+        else:
+            # 修改时间变化（如复制、重新下载），以内容哈希判断是否真的变化
+            content_hash = _file_sha256(path)
+            cache_valid = meta.get('sha256') == content_hash
+
+    if cache_valid:
+        try:
+            df = pd.read_parquet(cache_file)
+            if meta.get('mtime_ns') != stat.st_mtime_ns:
+                meta['mtime_ns'] = stat.st_mtime_ns
+                _write_cache_meta(meta_file, meta)
+            DATA_LOAD_TIMINGS[path] = {'来源': '列式缓存', '耗时(秒)': round(time.perf_counter() - start, 4)}
+            return df
+        except (ImportError, OSError, ValueError):
+            # 缓存损坏或缺少parquet引擎时回退到解析Excel
+            pass
+
+    df = read_excel_streaming(path, **read_kwargs)
+    parse_seconds = time.perf_counter() - start
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = cache_file + '.tmp'
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+        _write_cache_meta(meta_file, {
+            'source': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': content_hash or _file_sha256(path),
+            'read_kwargs': repr(read_kwargs)
+        })
+    except (ImportError, OSError, ValueError, TypeError):
+        # 列类型无法写入parquet或目录不可写时跳过缓存，不影响本次加载
+        if os.path.exists(cache_file + '.tmp'):
+            os.remove(cache_file + '.tmp')
+
+    DATA_LOAD_TIMINGS[path] = {
+        '来源': 'Excel解析',
+        '耗时(秒)': round(parse_seconds, 4),
+        '缓存构建(秒)': round(time.perf_counter() - start - parse_seconds, 4)
+    }
+    return df
+
+
+def _read_excel_worker(path, cache_dir, read_kwargs):
+    """工作进程内读取一个工作簿，耗时记录随结果返回主进程"""
+    df = read_excel_cached(path, cache_dir, **read_kwargs)
+    return df, DATA_LOAD_TIMINGS[path]
+
+
+def read_workbooks(paths, workers=None, cache_dir=EXCEL_CACHE_DIR, **read_kwargs):
+    """读取多个工作簿，按 paths 的顺序返回 DataFrame 列表
+
+    列式缓存有效的工作簿在主进程直接读取缓存；需要解析Excel的工作簿（冷启动或文件已变化）
+    不少于两个时在进程池中并行解析，每个工作簿占一个进程（pd.read_excel 单线程，瓶颈在 XML 解析）。
+    workers: 最大进程数，默认为需要解析的工作簿数；为 1 时串行读取
+    """
+    start = time.perf_counter()
+    stale = [path for path in paths if not _cache_is_fresh(path, cache_dir, read_kwargs)]
+    workers = min(workers or len(stale), len(stale))
+
+    frames = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(_read_excel_worker, path, cache_dir, read_kwargs) for path in stale}
+            for path, future in futures.items():
+                frames[path], DATA_LOAD_TIMINGS[path] = future.result()
+    for path in paths:
+        if path not in frames:
+            frames[path] = read_excel_cached(path, cache_dir, **read_kwargs)
+
+    DATA_LOAD_TIMINGS['合计'] = {
+        '来源': f"{workers}个进程并行解析" if workers > 1 else '串行读取',
+        '耗时(秒)': round(time.perf_counter() - start, 4)
+    }
+    return [frames[path] for path in paths]
+
+
+def normalize_price_columns(material_price):
+    """确保物料单价表含物料类别列（Excel 中重复表头会被读成 物料类别.1）"""
+    if '物料类别' not in material_price.columns:
+        if '物料类别.1' in material_price.columns:
+            material_price = material_price.rename(columns={'物料类别.1': '物料类别'})
+        else:
+            # 从第一列复制
+            material_price['物料类别'] = material_price.iloc[:, 2]
+    return material_price
+
+
+def load_data(sample_data=False, on_error=None, workers=None):
+    """加载和处理数据
+
+    读取真实数据失败时调用 on_error(异常)（界面层用它显示错误提示），然后回退到示例数据。
+    workers: 并行解析工作簿的进程数，见 read_workbooks
+    """
+
+    if sample_data:
+        # 使用示例数据
+        return generate_sample_data()
+    else:
+        try:
+            # 尝试加载真实数据（首次解析后读取列式缓存，需要解析的工作簿并行读取）
+            material_data, sales_data, material_price = read_workbooks(DATA_WORKBOOKS, workers=workers)
+
+            # 处理数据
+            return process_data(material_data, sales_data, normalize_price_columns(material_price))
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            # 如果加载真实数据失败，回退到示例数据
+            return generate_sample_data()
+
+
+def generate_sample_data(num_customers=50, num_months=12, num_materials=30, num_regions=7,
+                         seed=42, end_month=None):
+    """生成示例数据用于仪表板演示
+
+    基于 NumPy Generator 的列式向量化实现，相同参数和种子生成相同数据，可用于压测：
+    num_customers: 经销商数量
+    num_months: 月份数量（截止 end_month，默认当前月份）
+    num_materials: 物料种类数量
+    num_regions: 区域数量（超过7个时补充生成区域和省份）
+    """
+
+    # 设置随机种子以获得可重现的结果
+    rng = np.random.default_rng(seed)
+
+    # 区域和省份
+    provinces = {
+        '华东': ['上海', '江苏', '浙江', '安徽', '福建', '江西', '山东'],
+        '华南': ['广东', '广西', '海南'],
+        '华北': ['北京', '天津', '河北', '山西', '内蒙古'],
+        '华中': ['河南', '湖北', '湖南'],
+        '西南': ['重庆', '四川', '贵州', '云南', '西藏'],
+        '西北': ['陕西', '甘肃', '青海', '宁夏', '新疆'],
+        '东北': ['辽宁', '吉林', '黑龙江']
+    }
+    regions = list(provinces.keys())[:num_regions]
+    for i in range(len(regions), num_regions):
+        region = f'区域{str(i + 1).zfill(2)}'
+        regions.append(region)
+        provinces[region] = [f'{region}省份{j + 1}' for j in range(3)]
+
+    # 所有省份展开为一维数组，按区域记录起始位置和数量
+    all_provinces = np.array([p for region in regions for p in provinces[region]], dtype=object)
+    province_counts = np.array([len(provinces[region]) for region in regions])
+    province_offsets = np.concatenate([[0], np.cumsum(province_counts)[:-1]])
+
+    # 销售人员
+    sales_persons = np.array([f'销售员{chr(65 + i)}' for i in range(10)], dtype=object)
+
+    # 生成经销商数据
+    id_width = max(3, len(str(num_customers)))
+    customer_ids = np.array([f'C{str(i + 1).zfill(id_width)}' for i in range(num_customers)], dtype=object)
+    customer_names = np.array([f'经销商{str(i + 1).zfill(id_width)}' for i in range(num_customers)], dtype=object)
+
+    # 为每个经销商分配区域、省份和销售人员
+    customer_region_idx = rng.integers(0, len(regions), num_customers)
+    customer_province_idx = province_offsets[customer_region_idx] + (
+        rng.random(num_customers) * province_counts[customer_region_idx]).astype(np.int64)
+    customer_regions = np.array(regions, dtype=object)[customer_region_idx]
+    customer_provinces = all_provinces[customer_province_idx]
+    customer_sales = sales_persons[rng.integers(0, len(sales_persons), num_customers)]
+
+    # 生成月份数据（按月初排序）
+    end = pd.Timestamp(end_month) if end_month is not None else pd.Timestamp.now()
+    months = pd.date_range(end=end.normalize().replace(day=1), periods=num_months, freq='MS').to_numpy()
+
+    # 物料类别
+    material_categories = np.array(['促销物料', '陈列物料', '宣传物料', '赠品', '包装物料'], dtype=object)
+
+    # 生成物料数据
+    id_width = max(3, len(str(num_materials)))
+    material_ids = np.array([f'M{str(i + 1).zfill(id_width)}' for i in range(num_materials)], dtype=object)
+    material_names = np.array([f'物料{str(i + 1).zfill(id_width)}' for i in range(num_materials)], dtype=object)
+    material_cats = material_categories[rng.integers(0, len(material_categories), num_materials)]
+    material_prices = rng.uniform(10, 200, num_materials).round(2)
+
+    # 每个(月份, 客户)组合使用3-8种不重复的物料：随机键取最小的k个
+    num_pairs = num_months * num_customers
+    max_used = min(8, num_materials)
+    num_used = np.minimum(rng.integers(3, 9, num_pairs), num_materials)
+    selected = np.empty((num_pairs, max_used), dtype=np.int64)
+    chunk_size = max(1, (1 << 22) // num_materials)
+    for start in range(0, num_pairs, chunk_size):
+        stop = min(start + chunk_size, num_pairs)
+        keys = rng.random((stop - start, num_materials))
+        selected[start:stop] = np.argpartition(keys, max_used - 1, axis=1)[:, :max_used]
+
+    used_mask = np.arange(max_used) < num_used[:, None]
+    pair_idx = np.repeat(np.arange(num_pairs), num_used)
+    mat_idx = selected[used_mask]
+    month_idx = pair_idx // num_customers
+    customer_idx = pair_idx % num_customers
+
+    # 物料分发遵循正态分布
+    quantity = np.maximum(1, rng.normal(100, 30, len(pair_idx)).astype(np.int64))
+    unit_price = material_prices[mat_idx]
+    material_cost = (quantity * unit_price).round(2)
+
+    material_df = pd.DataFrame({
+        '发运月份': months[month_idx],
+        '客户代码': customer_ids[customer_idx],
+        '经销商名称': customer_names[customer_idx],
+        '所属区域': customer_regions[customer_idx],
+        '省份': customer_provinces[customer_idx],
+        '销售人员': customer_sales[customer_idx],
+        '产品代码': material_ids[mat_idx],
+        '产品名称': material_names[mat_idx],
+        '求和项:数量（箱）': quantity,
+        '物料类别': material_cats[mat_idx],
+        '单价（元）': unit_price,
+        '物料成本': material_cost
+    })
+
+    # 生成销售数据：根据该月物料总成本计算销售额
+    month_material_cost = np.bincount(pair_idx, weights=material_cost, minlength=num_pairs)
+    roi_factor = rng.uniform(0.5, 3.0, num_pairs)
+    avg_price_per_box = rng.uniform(300, 800, num_pairs)
+    sales_quantity = np.round(month_material_cost * roi_factor / avg_price_per_box).astype(np.int64)
+
+    has_sales = sales_quantity > 0
+    sales_pairs = np.flatnonzero(has_sales)
+    sales_customer_idx = sales_pairs % num_customers
+    sales_df = pd.DataFrame({
+        '发运月份': months[sales_pairs // num_customers],
+        '客户代码': customer_ids[sales_customer_idx],
+        '经销商名称': customer_names[sales_customer_idx],
+        '所属区域': customer_regions[sales_customer_idx],
+        '省份': customer_provinces[sales_customer_idx],
+        '销售人员': customer_sales[sales_customer_idx],
+        '求和项:数量（箱）': sales_quantity[has_sales],
+        '求和项:单价（箱）': avg_price_per_box[has_sales].round(2),
+        '销售金额': (sales_quantity[has_sales] * avg_price_per_box[has_sales]).round(2)
+    })
+
+    # 生成物料价格表
+    material_price_df = pd.DataFrame({
+        '物料代码': material_ids,
+        '物料名称': material_names,
+        '物料类别': material_cats,
+        '单价（元）': material_prices
+    })
+
+    # 调用process_data来生成日期列和distributor_data
+    material_df, sales_df, material_price_df, distributor_data = process_data(
+        material_df, sales_df, material_price_df
+    )
+
+    return material_df, sales_df, material_price_df, distributor_data
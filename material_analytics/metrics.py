@@ -0,0 +1,649 @@
+"""物料与产品分析指标：关键指标、ROI、组合挖掘、关联度、多样性与滞后效应"""
+
+import numpy as np
+import pandas as pd
+
+
+def compute_kpis(material_selection, sales_selection):
+    """关键指标卡：物料总成本、销售总额、ROI、物料销售比率和经销商数，返回一行的 DataFrame
+
+    material_selection / sales_selection: 物料和销售立方体的筛选结果（LazySelection），直接在位图上汇总
+    """
+    total_material_cost = material_selection.sum('物料成本')
+    total_sales = sales_selection.sum('销售金额')
+    return pd.DataFrame([{
+        '物料总成本': total_material_cost,
+        '销售总额': total_sales,
+        'ROI': total_sales / total_material_cost if total_material_cost > 0 else 0,
+        '物料销售比率': (total_material_cost / total_sales * 100) if total_sales > 0 else 0,
+        '经销商数': sales_selection.nunique('经销商名称')
+    }])
+
+
+def compute_monthly_sales(cube, filters=None):
+    """按月汇总销售金额，按月份排序"""
+    monthly_sales = cube.rollup('sales', '月份名', filters)[['月份名', '销售金额']]
+    monthly_sales['月份序号'] = pd.to_datetime(monthly_sales['月份名']).dt.strftime('%Y%m').astype(int)
+    return monthly_sales.sort_values('月份序号')
+
+
+def compute_segment_counts(distributor_data):
+    """各客户价值分层的经销商数量"""
+    segment_counts = distributor_data['客户价值分层'].value_counts().reset_index()
+    segment_counts.columns = ['客户价值分层', '经销商数量']
+    return segment_counts
+
+
+def compute_category_cost(material_data):
+    """各物料类别的物料成本（按类别着色时 plotly 会查找全部分类，转回字符串只保留出现的类别）"""
+    category_cost = material_data.groupby('物料类别', observed=True)['物料成本'].sum().sort_index().reset_index()
+    category_cost['物料类别'] = category_cost['物料类别'].astype(object)
+    return category_cost
+
+
+def compute_category_share(category_cost):
+    """物料类别成本占比（百分比，保留两位小数），按物料成本降序
+
+    category_cost: compute_category_cost 的结果（或同结构的类别成本汇总）
+    """
+    category_share = category_cost.sort_values('物料成本', ascending=False, kind='stable')
+    return category_share.assign(占比=(category_share['物料成本'] / category_share['物料成本'].sum() * 100).round(2))
+
+
+def compute_segment_sales(distributor_data):
+    """各客户价值分层的销售总额及占比（百分比，保留两位小数）"""
+    segment_sales = distributor_data.groupby('客户价值分层')['销售总额'].sum().reset_index()
+    segment_sales['占比'] = (segment_sales['销售总额'] / segment_sales['销售总额'].sum() * 100).round(2)
+    return segment_sales
+
+
+def compute_segment_efficiency(distributor_data):
+    """各客户价值分层的平均ROI和平均物料销售比率"""
+    return distributor_data.groupby('客户价值分层').agg({
+        'ROI': 'mean',
+        '物料销售比率': 'mean'
+    }).reset_index()
+
+
+def compute_region_cost_ratio(distributor_data):
+    """各区域的平均费比、物料总成本、销售总额、经销商数量和综合费比（物料总成本 ÷ 销售总额）"""
+    region_cost_ratio = distributor_data.groupby('所属区域', observed=True).agg({
+        '物料销售比率': 'mean',
+        '物料总成本': 'sum',
+        '销售总额': 'sum',
+        '客户代码': 'nunique'
+    }).sort_index().reset_index()
+
+    region_cost_ratio.rename(columns={'客户代码': '经销商数量'}, inplace=True)
+
+    # 确保保留两位小数
+    region_cost_ratio['物料销售比率'] = region_cost_ratio['物料销售比率'].round(2)
+    region_cost_ratio['综合费比'] = (region_cost_ratio['物料总成本'] / region_cost_ratio['销售总额'] * 100).round(2)
+    return region_cost_ratio
+
+
+def compute_distributor_monthly(cube, customer_code):
+    """单个经销商的月度物料成本、销售金额和ROI（没有物料投入的月份ROI记为0），按月份排序"""
+    monthly_data = pd.merge(
+        cube.rollup('material', '月份名', {'客户代码': [customer_code]})[['月份名', '物料成本']],
+        cube.rollup('sales', '月份名', {'客户代码': [customer_code]})[['月份名', '销售金额']],
+        on='月份名',
+        how='outer'
+    ).fillna(0)
+    monthly_data['ROI'] = np.where(monthly_data['物料成本'] > 0,
+                                   monthly_data['销售金额'] / monthly_data['物料成本'].where(monthly_data['物料成本'] > 0, 1),
+                                   0)
+    monthly_data['月份序号'] = pd.to_datetime(monthly_data['月份名']).dt.strftime('%Y%m').astype(int)
+    return monthly_data.sort_values('月份序号')
+
+
+# 销售规模分组（按销售总额四分位）及各规模的建议物料多样性：max(下限, 当前多样性 × 系数)
+SALES_SCALE_LABELS = ['小规模', '中小规模', '中大规模', '大规模']
+SCALE_DIVERSITY_TARGETS = {'大规模': (8, 1.2), '中大规模': (6, 1.15), '中小规模': (5, 1.1), '小规模': (3, 1.05)}
+
+
+def optimal_diversity(scale, diversity):
+    """各行的建议物料多样性（取整）；销售规模缺失（销售总额不在分组区间内）时按小规模处理"""
+    scale = pd.Series(scale).astype(object)
+    floor = scale.map({label: target[0] for label, target in SCALE_DIVERSITY_TARGETS.items()}).fillna(3)
+    factor = scale.map({label: target[1] for label, target in SCALE_DIVERSITY_TARGETS.items()}).fillna(1.05)
+    return np.round(np.fmax(floor.to_numpy(dtype=float),
+                            np.asarray(diversity, dtype=float) * factor.to_numpy(dtype=float)))
+
+
+def compute_scale_diversity(distributor_data, top_n=10):
+    """按销售规模分析物料多样性现状与建议值
+
+    返回 (scale_metrics, diversity_gap)：scale_metrics 为各销售规模的平均ROI、物料多样性、物料销售比率、
+    经销商数量和建议物料多样性；diversity_gap 为建议值与当前物料多样性差距大于1的前 top_n 个经销商，
+    带销售规模和物料多样性差异列，按差异降序
+    """
+    sales_quartiles = distributor_data['销售总额'].quantile([0.25, 0.5, 0.75]).tolist()
+    distributors = distributor_data.assign(销售规模=pd.cut(
+        distributor_data['销售总额'],
+        bins=[0] + sales_quartiles + [float('inf')],
+        labels=SALES_SCALE_LABELS
+    ))
+
+    # 计算各规模经销商的平均指标
+    scale_metrics = distributors.groupby('销售规模').agg({
+        'ROI': 'mean',
+        '物料多样性': 'mean',
+        '物料销售比率': 'mean',
+        '经销商名称': 'count'
+    }).reset_index()
+    scale_metrics.rename(columns={'经销商名称': '经销商数量'}, inplace=True)
+    scale_metrics['建议物料多样性'] = optimal_diversity(scale_metrics['销售规模'], scale_metrics['物料多样性'])
+
+    # 物料多样性差异（未使用物料的经销商记为0）
+    gap = optimal_diversity(distributors['销售规模'], distributors['物料多样性']) - distributors['物料多样性']
+    distributors['物料多样性差异'] = gap.where(distributors['物料多样性'] > 0, 0)
+    diversity_gap = distributors[distributors['物料多样性差异'] > 1].sort_values(
+        '物料多样性差异', ascending=False).head(top_n)
+    return scale_metrics, diversity_gap
+
+
+def compute_efficiency_group_mix(cube, distributor_data, top_n=3):
+    """高效与低效经销商的物料类别组合对比
+
+    取ROI最高的 top_n 个经销商为高效组、ROI大于0中最低的 top_n 个为低效组，按经销商计算各物料类别的成本占比，
+    再按效率分组求平均占比。返回 DataFrame：效率分组、物料类别、占比（百分比）、经销商数量
+    """
+    compare_dists = pd.concat([
+        distributor_data.sort_values('ROI', ascending=False).head(top_n).assign(效率分组='高效经销商'),
+        distributor_data[distributor_data['ROI'] > 0].sort_values('ROI').head(top_n).assign(效率分组='低效经销商')
+    ])[['客户代码', '经销商名称', '效率分组']]
+    compare_dists['客户代码'] = compare_dists['客户代码'].astype(object)
+
+    # 一次汇总对比经销商的 经销商 × 物料类别 成本，组内求占比
+    cat_totals = cube.rollup('material', ['客户代码', '物料类别'],
+                             {'客户代码': compare_dists['客户代码'].unique().tolist()})[['客户代码', '物料类别', '物料成本']]
+    cat_totals['客户代码'] = cat_totals['客户代码'].astype(object)
+    cat_totals['占比'] = cat_totals['物料成本'] / cat_totals.groupby('客户代码')['物料成本'].transform('sum') * 100
+    compare_materials = pd.merge(compare_dists, cat_totals, on='客户代码')
+
+    # 计算高效和低效组的平均物料占比
+    group_avg = compare_materials.groupby(['效率分组', '物料类别'], observed=True).agg({
+        '占比': 'mean',
+        '经销商名称': 'count'
+    }).sort_index().reset_index()
+    return group_avg.rename(columns={'经销商名称': '经销商数量'})
+
+
+def compute_material_roi(attribution, filters=None):
+    """各物料的归因ROI：经销商当月销售额按物料成本占比分配后，分配销售额合计 ÷ 物料成本合计"""
+    material_roi = attribution.rollup(['产品代码', '产品名称'], filters)
+    material_roi = material_roi.loc[material_roi['物料成本'] > 0].copy()
+    material_roi['物料ROI'] = material_roi['ROI'].round(2)
+
+    # 获取物料类别信息
+    material_categories = attribution.facts[['产品代码', '物料类别']].drop_duplicates('产品代码')
+    material_roi = pd.merge(material_roi[['产品代码', '产品名称', '物料ROI']], material_categories, on='产品代码',
+                            how='left')
+
+    # 对于缺失的类别信息，填充默认值（分类列不能直接填充字典外的取值）
+    material_roi['物料类别'] = material_roi['物料类别'].astype(object).fillna('未分类')
+    return material_roi
+
+
+def cooccurrence_itemsets(indicator, roi, max_k=2, min_support=1, block_cells=4_000_000):
+    """基于矩阵乘积的 k 项组合共现统计
+
+    indicator: 记录 × 项目 的0/1矩阵；roi: 每条记录的ROI
+    逐层扩展组合：P 为 (k-1) 项频繁组合的行指示矩阵（记录 × 组合），Pᵀ·X 和 Pᵀ·(X∘roi)
+    一次给出所有 k 项组合的支持数和ROI合计（k=2 时即 Xᵀ·X 与 Xᵀ·(X∘roi)）。
+    只扩展支持数不低于 min_support 的组合，新增项目编号大于组合内已有项目，避免重复；
+    P 按 block_cells 个单元分块构造，项目数较多时内存占用保持有界。
+    返回 DataFrame：组合（项目编号元组）、项数、支持数、ROI合计、平均ROI，按组合顺序排列
+    """
+    X = np.asarray(indicator, dtype=np.float64)
+    roi = np.asarray(roi, dtype=np.float64)
+    weighted = X * roi[:, None]
+    item_ids = np.arange(X.shape[1])
+    block_size = max(1, block_cells // max(X.shape[0], 1))
+
+    # 1项频繁组合
+    frequent = np.flatnonzero(X.sum(axis=0) >= min_support)[:, None]
+
+    itemsets, supports, roi_sums = [], [], []
+    for _ in range(2, max_k + 1):
+        extended = []
+        for start in range(0, len(frequent), block_size):
+            block = frequent[start:start + block_size]
+            rows = X[:, block[:, 0]]
+            for col in range(1, block.shape[1]):
+                rows = rows * X[:, block[:, col]]
+
+            counts = rows.T @ X
+            sums = rows.T @ weighted
+            set_idx, item_idx = np.nonzero((counts >= min_support) & (item_ids[None, :] > block[:, -1:]))
+            extended.append(np.column_stack([block[set_idx], item_idx]))
+            supports.append(counts[set_idx, item_idx])
+            roi_sums.append(sums[set_idx, item_idx])
+
+        if not extended:
+            break
+        frequent = np.concatenate(extended)
+        itemsets.extend(map(tuple, frequent.tolist()))
+
+    supports = np.concatenate(supports) if supports else np.array([])
+    roi_sums = np.concatenate(roi_sums) if roi_sums else np.array([])
+    return pd.DataFrame({
+        '组合': itemsets,
+        '项数': [len(items) for items in itemsets],
+        '支持数': supports.astype(int),
+        'ROI合计': roi_sums,
+        '平均ROI': roi_sums / np.where(supports > 0, supports, 1)
+    })
+
+
+def mine_frequent_itemsets(basket_ids, item_ids, n_items, basket_roi, min_support, max_k=3):
+    """基于投影数据库的频繁项集挖掘（FP-growth 式模式增长）
+
+    篮子以稀疏行压缩形式保存：篮子按编号排序后，indptr 记录每个篮子的项目起止位置，
+    只存储实际出现的 (篮子, 项目) 对。以某个项集为前缀时，只取包含该前缀的篮子（投影数据库），
+    用 bincount 一次统计其中编号更大的项目的出现次数和篮子ROI合计，再对频繁扩展递归，
+    不生成候选项集，也不展开 篮子 × 项目 的稠密矩阵。
+    basket_ids, item_ids: 去重后的 (篮子, 项目) 编号对；basket_roi: 按篮子编号的ROI
+    min_support: 最少篮子数；max_k: 项集最多包含的项目数
+    返回 (项集元组, 支持数, ROI合计) 列表
+    """
+    order = np.lexsort((item_ids, basket_ids))
+    basket_ids, item_ids = basket_ids[order], item_ids[order]
+    n_baskets = len(basket_roi)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(basket_ids, minlength=n_baskets))])
+
+    results = []
+
+    def grow(prefix, baskets):
+        # 投影数据库：前缀所在篮子中编号大于前缀末项的项目
+        starts = indptr[baskets]
+        lengths = indptr[baskets + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        items = item_ids[positions]
+        owners = np.repeat(baskets, lengths)
+        if prefix:
+            keep = items > prefix[-1]
+            items, owners = items[keep], owners[keep]
+
+        counts = np.bincount(items, minlength=n_items)
+        roi_sums = np.bincount(items, weights=basket_roi[owners], minlength=n_items)
+        frequent = np.flatnonzero(counts >= min_support)
+        if len(frequent) == 0:
+            return
+
+        # 按项目分组得到每个扩展项集的篮子列表
+        grouped = np.argsort(items, kind='stable')
+        bounds = np.searchsorted(items[grouped], frequent, side='left'), \
+            np.searchsorted(items[grouped], frequent, side='right')
+        for item, lo, hi in zip(frequent, *bounds):
+            itemset = prefix + (int(item),)
+            results.append((itemset, int(counts[item]), float(roi_sums[item])))
+            if len(itemset) < max_k:
+                grow(itemset, owners[grouped[lo:hi]])
+
+    grow((), np.arange(n_baskets))
+    return results
+
+
+def compute_product_bundles(material_data, distributor_data, min_support=0.01, max_k=3, min_items=2):
+    """挖掘 (经销商, 月份) 物料篮子中的高频产品组合
+
+    每个经销商每月使用的产品代码构成一个篮子，篮子ROI取该经销商当月ROI。
+    min_support: 最小支持度（篮子占比）；只返回不少于 min_items 个产品的组合
+    返回 DataFrame：组合、产品组合、项数、支持数、支持度、提升度、平均ROI，按提升度降序
+    """
+    # 篮子编号：经销商和月份的分类编码组合（共享字典，物料与经销商数据编码一致）
+    customers = material_data['客户代码'].cat.codes.to_numpy().astype(np.int64)
+    months = material_data['月份名'].cat.codes.to_numpy().astype(np.int64)
+    n_months = len(material_data['月份名'].cat.categories)
+    basket_keys, basket_ids = np.unique(customers * n_months + months, return_inverse=True)
+
+    # 项目编号：产品代码的分类编码，去重 (篮子, 产品) 对
+    products = material_data['产品代码'].cat.codes.to_numpy().astype(np.int64)
+    n_items = len(material_data['产品代码'].cat.categories)
+    pairs = np.unique(basket_ids.astype(np.int64) * n_items + products)
+    basket_ids, item_ids = pairs // n_items, pairs % n_items
+
+    # 篮子ROI（经销商当月ROI，缺失记为0）
+    distributor_keys = (distributor_data['客户代码'].cat.codes.to_numpy().astype(np.int64) * n_months +
+                        distributor_data['月份名'].cat.codes.to_numpy().astype(np.int64))
+    position = np.searchsorted(basket_keys, distributor_keys)
+    matched = (position < len(basket_keys)) & (basket_keys[np.minimum(position, len(basket_keys) - 1)] == distributor_keys)
+    basket_roi = np.zeros(len(basket_keys))
+    basket_roi[position[matched]] = distributor_data['ROI'].to_numpy()[matched]
+
+    n_baskets = len(basket_keys)
+    min_count = max(1, int(np.ceil(min_support * n_baskets)))
+    itemsets = mine_frequent_itemsets(basket_ids, item_ids, n_items, basket_roi, min_count, max_k=max_k)
+
+    # 单品支持度，用于计算提升度
+    item_support = np.bincount(item_ids, minlength=n_items) / max(n_baskets, 1)
+    product_codes = np.asarray(material_data['产品代码'].cat.categories, dtype=object)
+    product_names = material_data[['产品代码', '产品名称']].drop_duplicates('产品代码').astype(object).set_index(
+        '产品代码')['产品名称'].reindex(product_codes)
+    product_names = product_names.fillna(pd.Series(product_codes, index=product_codes)).to_numpy()
+
+    bundles = pd.DataFrame(
+        [(items, count, roi_sum) for items, count, roi_sum in itemsets if len(items) >= min_items],
+        columns=['组合', '支持数', 'ROI合计']
+    )
+    if bundles.empty:
+        return pd.DataFrame(columns=['组合', '产品组合', '项数', '支持数', '支持度', '提升度', '平均ROI'])
+
+    bundles['项数'] = bundles['组合'].map(len)
+    bundles['支持度'] = bundles['支持数'] / n_baskets
+    bundles['提升度'] = bundles['支持度'] / bundles['组合'].map(lambda items: np.prod(item_support[list(items)]))
+    bundles['平均ROI'] = bundles['ROI合计'] / bundles['支持数']
+    bundles['产品组合'] = bundles['组合'].map(lambda items: ' + '.join(map(str, product_names[list(items)])))
+    bundles['组合'] = bundles['组合'].map(lambda items: tuple(product_codes[list(items)]))
+    return bundles[['组合', '产品组合', '项数', '支持数', '支持度', '提升度', '平均ROI']].sort_values(
+        '提升度', ascending=False).reset_index(drop=True)
+
+
+def distributor_item_pairs(df, item_col):
+    """经销商 × 项目 的稀疏0/1矩阵
+
+    以去重后按经销商排序的 (经销商编码, 项目编码) 对表示，编码取共享字典的分类编码。
+    返回 (经销商编码数组, 项目编码数组)
+    """
+    customers = df['客户代码'].cat.codes.to_numpy().astype(np.int64)
+    items = df[item_col].cat.codes.to_numpy().astype(np.int64)
+    n_items = len(df[item_col].cat.categories)
+    valid = (customers >= 0) & (items >= 0)
+    pairs = np.unique(customers[valid] * n_items + items[valid])
+    return pairs // n_items, pairs % n_items
+
+
+def cross_counts(left, right, n_rows, block_cells=4_000_000):
+    """两个稀疏0/1矩阵的交叉计数 Lᵀ·R
+
+    left, right: distributor_item_pairs 返回的 (行编码, 项目编码) 对，项目编码已压缩为 0..n-1；
+    n_rows: 行（经销商）数。按行分块展开为稠密块再相乘，内存占用由 block_cells 限定。
+    返回 (左项目数 × 右项目数) 的共现次数矩阵
+    """
+    (left_rows, left_items), (right_rows, right_items) = left, right
+    n_left = int(left_items.max()) + 1 if len(left_items) else 0
+    n_right = int(right_items.max()) + 1 if len(right_items) else 0
+    counts = np.zeros((n_left, n_right))
+    block_size = max(1, block_cells // max(n_left + n_right, 1))
+
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        left_lo, left_hi = np.searchsorted(left_rows, [start, stop])
+        right_lo, right_hi = np.searchsorted(right_rows, [start, stop])
+        left_block = np.zeros((stop - start, n_left))
+        left_block[left_rows[left_lo:left_hi] - start, left_items[left_lo:left_hi]] = 1
+        right_block = np.zeros((stop - start, n_right))
+        right_block[right_rows[right_lo:right_hi] - start, right_items[right_lo:right_hi]] = 1
+        counts += left_block.T @ right_block
+    return counts
+
+
+def compute_product_material_affinity(material_data, sales_data):
+    """产品与物料的亲和度
+
+    分别构建 经销商 × 产品（销售明细）和 经销商 × 物料（物料明细）的稀疏0/1矩阵，
+    一次交叉计数得到每个产品-物料对被同一经销商同时经营的次数，再向量化计算：
+    提升度 = 共现数 × 经销商数 / (产品经销商数 × 物料经销商数)
+    相关系数 = 两个0/1向量的 phi 系数
+    销售明细没有产品代码时，产品侧退化为物料明细中的产品代码（即物料之间的共用关系），并去掉自身配对。
+    返回 DataFrame：产品代码、产品名称、物料代码、物料名称、共现数、提升度、相关系数
+    """
+    product_source = sales_data if '产品代码' in sales_data.columns else material_data
+    product_rows, product_items = distributor_item_pairs(product_source, '产品代码')
+    material_rows, material_items = distributor_item_pairs(material_data, '产品代码')
+
+    # 项目编码压缩为各自出现过的项目
+    product_codes, product_items = np.unique(product_items, return_inverse=True)
+    material_codes, material_items = np.unique(material_items, return_inverse=True)
+    n_rows = len(material_data['客户代码'].cat.categories)
+    counts = cross_counts((product_rows, product_items), (material_rows, material_items), n_rows)
+
+    n = len(np.union1d(product_rows, material_rows))
+    product_support = np.bincount(product_items, minlength=len(product_codes)).astype(float)
+    material_support = np.bincount(material_items, minlength=len(material_codes)).astype(float)
+    expected = np.outer(product_support, material_support)
+    lift = np.divide(counts * n, expected, out=np.zeros_like(counts), where=expected > 0)
+    spread = np.sqrt(np.outer(product_support * (n - product_support), material_support * (n - material_support)))
+    correlation = np.divide(counts * n - expected, spread, out=np.zeros_like(counts), where=spread > 0)
+
+    # 编码还原为代码和名称
+    categories = np.asarray(material_data['产品代码'].cat.categories, dtype=object)
+    names = pd.concat([
+        df[['产品代码', '产品名称']].astype(object) for df in (product_source, material_data)
+    ]).drop_duplicates('产品代码').set_index('产品代码')['产品名称']
+    product_codes, material_codes = categories[product_codes], categories[material_codes]
+
+    affinity = pd.DataFrame({
+        '产品代码': np.repeat(product_codes, len(material_codes)),
+        '物料代码': np.tile(material_codes, len(product_codes)),
+        '共现数': counts.ravel().astype(int),
+        '提升度': lift.ravel(),
+        '相关系数': correlation.ravel()
+    })
+    affinity['产品名称'] = affinity['产品代码'].map(names).fillna(affinity['产品代码'])
+    affinity['物料名称'] = affinity['物料代码'].map(names).fillna(affinity['物料代码'])
+    if product_source is material_data:
+        affinity = affinity[affinity['产品代码'] != affinity['物料代码']]
+    return affinity[['产品代码', '产品名称', '物料代码', '物料名称', '共现数', '提升度', '相关系数']].reset_index(drop=True)
+
+
+def top_affinity_matrix(affinity, top_n=8, score='提升度', min_count=1):
+    """按亲和度选取前 top_n 个产品和物料，返回 产品名称 × 物料名称 的得分矩阵
+
+    产品按其最高得分排序取前 top_n 个，物料在这些产品的配对中按最高得分取前 top_n 个。
+    """
+    candidates = affinity[affinity['共现数'] >= min_count]
+    if candidates.empty:
+        return pd.DataFrame()
+    products = candidates.groupby('产品名称')[score].max().sort_values(ascending=False, kind='stable').head(top_n).index
+    candidates = candidates[candidates['产品名称'].isin(products)]
+    materials = candidates.groupby('物料名称')[score].max().sort_values(ascending=False, kind='stable').head(top_n).index
+    selected = affinity[affinity['产品名称'].isin(products) & affinity['物料名称'].isin(materials)]
+    return selected.pivot_table(index='产品名称', columns='物料名称', values=score, aggfunc='mean').reindex(
+        index=products, columns=materials)
+
+
+def compute_material_combinations(item_costs, distributor_data, item_col='物料类别', max_k=2, min_support=3,
+                                  share_threshold=10):
+    """统计经销商同时使用的物料组合（组合内各项占其物料投入 share_threshold% 以上）的经销商数量和平均ROI
+
+    item_costs: 含 客户代码、item_col、物料成本 的明细或汇总，item_col 可为物料类别或产品代码
+    max_k: 组合最多包含的项目数；min_support: 组合至少被多少个经销商使用
+    结果按平均ROI降序
+    """
+    # 经销商 × 项目 的物料投入矩阵
+    distributor_material_combos_pivot = item_costs.pivot_table(
+        index='客户代码',
+        columns=item_col,
+        values='物料成本',
+        aggfunc='sum'
+    ).fillna(0)
+
+    # 为每个经销商计算各项目占比
+    distributor_material_combos_pivot = distributor_material_combos_pivot.div(
+        distributor_material_combos_pivot.sum(axis=1), axis=0
+    ) * 100
+
+    # 创建二进制使用标志 (1表示该项目投入占比超过阈值)
+    binary_material_usage = (distributor_material_combos_pivot > share_threshold).astype(int)
+
+    # 获取每个经销商的ROI
+    distributor_roi = distributor_data.groupby('客户代码', observed=True)['ROI'].mean().sort_index().reset_index()
+
+    # 合并二进制物料使用和ROI数据
+    combined_data = pd.merge(binary_material_usage.reset_index(), distributor_roi, on='客户代码')
+
+    # 所有组合的共现统计
+    material_items = binary_material_usage.columns.tolist()
+    itemsets = cooccurrence_itemsets(
+        combined_data[material_items].to_numpy(), combined_data['ROI'].to_numpy(),
+        max_k=max_k, min_support=min_support
+    )
+
+    combo_df = pd.DataFrame({
+        '组合': [' + '.join(str(material_items[i]) for i in items) for items in itemsets['组合']],
+        '平均ROI': itemsets['平均ROI'].round(2),
+        '使用经销商数': itemsets['支持数']
+    })
+
+    # 按ROI排序
+    return combo_df.sort_values('平均ROI', ascending=False)
+
+
+def compute_diversity_metrics(distributor_data):
+    """按物料多样性水平分组统计平均ROI、物料销售比率和经销商数量"""
+    # 分组多样性水平
+    diversity_bins = [0, 2, 4, 6, 8, 10, 15, np.inf]
+    diversity_labels = ['0-2种', '3-4种', '5-6种', '7-8种', '9-10种', '11-15种', '16种+']
+
+    # 多样性水平作为分类变量
+    diversity_level = pd.cut(
+        distributor_data['物料多样性'],
+        bins=diversity_bins,
+        labels=diversity_labels,
+        right=False
+    ).rename('多样性水平')
+
+    # 按多样性水平分组
+    diversity_metrics = distributor_data.groupby(diversity_level).agg({
+        'ROI': 'mean',
+        '物料销售比率': 'mean',
+        '客户代码': 'count'
+    }).reset_index()
+
+    diversity_metrics.rename(columns={'客户代码': '经销商数量'}, inplace=True)
+
+    # 确保保留两位小数
+    diversity_metrics['ROI'] = diversity_metrics['ROI'].round(2)
+    diversity_metrics['物料销售比率'] = diversity_metrics['物料销售比率'].round(2)
+    return diversity_metrics
+
+
+def compute_category_roi(attribution, filters=None):
+    """各物料类别的归因ROI（与 compute_material_roi 同一份归因明细），按ROI降序"""
+    category_roi = attribution.rollup('物料类别', filters)
+    category_roi = category_roi[category_roi['物料成本'] > 0].rename(columns={'ROI': '类别ROI'})
+    return category_roi[['物料类别', '类别ROI']].sort_values('类别ROI', ascending=False)
+
+
+def monthly_panel(cube, by=None, filters=None):
+    """构造 分组 × 月份 的物料成本和销售金额面板
+
+    by: 分组维度列表（如 客户代码、所属区域、物料类别），为空时为全国汇总；
+    销售立方体没有的维度（物料类别）按其余维度取销售金额，即物料类别与所在分组的总销售额对齐。
+    月份轴为首尾月份之间的连续月份，缺失月份记为0，保证平移 k 列即滞后 k 个月。
+    返回 (分组DataFrame, 月份PeriodIndex, 物料成本矩阵, 销售金额矩阵, 有销售记录的月份位图)
+    """
+    by = list(by or [])
+    sales_by = [col for col in by if col in cube.sales.columns]
+    material = cube.rollup('material', by + ['月份名'], filters)
+    sales = cube.rollup('sales', sales_by + ['月份名'], filters)
+
+    # 月份按取值解析一次，行上只做编码查表
+    month_codes, month_names = {}, {}
+    for name, df in (('material', material), ('sales', sales)):
+        month_codes[name], month_names[name] = pd.factorize(df['月份名'])
+    month_values = pd.PeriodIndex(
+        pd.Index(np.concatenate([np.asarray(month_names['material'], dtype=object),
+                                 np.asarray(month_names['sales'], dtype=object)])).astype(str), freq='M')
+    if len(month_values) == 0:
+        return pd.DataFrame(columns=by), pd.PeriodIndex([], freq='M'), np.zeros((0, 0)), np.zeros((0, 0)), \
+            np.zeros(0, dtype=bool)
+    months = pd.period_range(month_values.min(), month_values.max(), freq='M')
+
+    def positions(name):
+        lookup = months.get_indexer(pd.PeriodIndex(pd.Index(month_names[name]).astype(str), freq='M'))
+        return lookup[month_codes[name]]
+
+    # 物料侧分组编号
+    if by:
+        material_groups = material.groupby(by, observed=True, sort=True)
+        segment_ids = material_groups.ngroup().to_numpy()
+        segments = material_groups.size().reset_index()[by]
+    else:
+        segment_ids = np.zeros(len(material), dtype=np.int64)
+        segments = pd.DataFrame(index=[0])
+    cost = np.zeros((len(segments), len(months)))
+    np.add.at(cost, (segment_ids, positions('material')), material['物料成本'].to_numpy())
+
+    # 销售侧按 sales_by 分组后对齐到物料侧分组
+    if sales_by:
+        sales_groups = sales.groupby(sales_by, observed=True, sort=True)
+        sales_keys = sales_groups.size().reset_index()[sales_by]
+        sales_ids = sales_groups.ngroup().to_numpy()
+        lookup = segments[sales_by].merge(sales_keys.assign(_pos=np.arange(len(sales_keys))), on=sales_by,
+                                          how='left')['_pos'].to_numpy()
+    else:
+        sales_keys = pd.DataFrame(index=[0])
+        sales_ids = np.zeros(len(sales), dtype=np.int64)
+        lookup = np.zeros(len(segments))
+    sales_raw = np.zeros((len(sales_keys) + 1, len(months)))
+    np.add.at(sales_raw, (sales_ids, positions('sales')), sales['销售金额'].to_numpy())
+    lookup = np.where(np.isnan(lookup.astype(float)), len(sales_keys), lookup).astype(np.int64)
+
+    has_sales = np.zeros(len(months), dtype=bool)
+    has_sales[positions('sales')] = True
+    return segments.reset_index(drop=True), months, cost, sales_raw[lookup], has_sales
+
+
+def compute_lag_effects(cube, by=None, max_lag=3, filters=None, min_periods=3):
+    """物料投入对销售的滞后效应
+
+    在 monthly_panel 面板上把物料成本平移 0..max_lag 个月，对所有分组一次向量化计算：
+    相关系数 = 物料成本(t) 与 销售金额(t+滞后) 的互相关（Pearson）
+    效应系数 = 重叠月份的销售金额合计 ÷ 物料成本合计
+    重叠月份少于 min_periods 的滞后不计算。每个分组取相关系数最高的滞后为最佳滞后。
+    返回 (逐滞后明细, 各分组最佳滞后)，两者均含 by 维度列、滞后月数、相关系数、效应系数
+    """
+    segments, months, cost, sales, _ = monthly_panel(cube, by, filters)
+    n_segments, n_months = cost.shape
+    lags = np.arange(max_lag + 1)
+    correlation = np.full((n_segments, len(lags)), np.nan)
+    effect = np.full((n_segments, len(lags)), np.nan)
+
+    for lag in lags:
+        if n_months - lag < min_periods:
+            break
+        x = cost[:, :n_months - lag]
+        y = sales[:, lag:]
+        xc = x - x.mean(axis=1, keepdims=True)
+        yc = y - y.mean(axis=1, keepdims=True)
+        spread = np.sqrt((xc ** 2).sum(axis=1) * (yc ** 2).sum(axis=1))
+        np.divide((xc * yc).sum(axis=1), spread, out=correlation[:, lag], where=spread > 0)
+        x_total = x.sum(axis=1)
+        np.divide(y.sum(axis=1), x_total, out=effect[:, lag], where=x_total > 0)
+
+    by_cols = list(segments.columns) if by else []
+    effects = segments.loc[np.repeat(np.arange(n_segments), len(lags)), by_cols].reset_index(drop=True)
+    effects['滞后月数'] = np.tile(lags, n_segments)
+    effects['相关系数'] = correlation.ravel()
+    effects['效应系数'] = effect.ravel()
+
+    # 最佳滞后：相关系数最高（全部无法计算的分组不输出）
+    valid = ~np.isnan(correlation).all(axis=1)
+    best_lag = np.argmax(np.where(np.isnan(correlation), -np.inf, correlation), axis=1)
+    rows = np.flatnonzero(valid)
+    best = segments.loc[rows, by_cols].reset_index(drop=True)
+    best['滞后月数'] = lags[best_lag[rows]]
+    best['相关系数'] = correlation[rows, best_lag[rows]]
+    best['效应系数'] = effect[rows, best_lag[rows]]
+    return effects, best
+
+
+def lagged_effect_series(cube, lag=1):
+    """全国逐月滞后效应系数：当月销售金额 ÷ lag 个月前的物料投入
+
+    只保留有销售记录且前期物料投入大于0的月份。返回 DataFrame：月份名、销售金额、前月物料投入、效应系数
+    """
+    _, months, cost, sales, has_sales = monthly_panel(cube)
+    if len(months) <= lag:
+        return pd.DataFrame(columns=['月份名', '销售金额', '前月物料投入', '效应系数'])
+    series = pd.DataFrame({
+        '月份名': months[lag:].strftime('%Y-%m'),
+        '销售金额': sales[0, lag:],
+        '前月物料投入': cost[0, :len(months) - lag]
+    })
+    series['效应系数'] = (series['销售金额'] / series['前月物料投入'].where(series['前月物料投入'] > 0)).round(2)
+    return series[has_sales[lag:]].dropna().reset_index(drop=True)
@@ -0,0 +1,266 @@
+"""仪表盘指标批量预计算：按筛选切片计算全部指标，写入分区 Parquet
+
+用法: python -m material_analytics.precompute [--output precomputed] [--workers 4] [--sample]
+                                              [--dimensions 所属区域 省份 销售人员 物料类别] [--metrics 关键指标 ...]
+
+切片为全部数据加上 --dimensions 中每个维度的每个取值（只选中该取值、其余维度全选）。
+仪表盘按筛选条件查询的当月指标逐切片计算，只依赖数据集的指标只计算全部数据切片。
+各切片在进程池中并行计算，结果按 <指标>/维度=<维度>/取值=<取值>/part-0.parquet 分区存放，
+全部写完后与 manifest.json 一起替换输出目录，仪表盘不会读到写了一半的结果。
+仪表盘检测到输出目录且数据签名一致时进入预计算模式，命中切片的指标直接读取，不再现场计算。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .loading import load_data
+from .metrics import (
+    compute_category_cost, compute_category_roi, compute_diversity_metrics, compute_kpis, compute_material_combinations,
+    compute_material_roi, compute_monthly_sales, compute_product_bundles, compute_product_material_affinity,
+    compute_segment_counts
+)
+from .store import DatasetStore
+
+# 默认预计算的切片维度
+PRECOMPUTED_SLICE_DIMENSIONS = ['所属区域', '省份', '销售人员', '物料类别']
+
+# 全部数据切片的维度和取值
+ALL_SLICE = '全部'
+
+# 预计算结果清单文件名
+MANIFEST_FILE = 'manifest.json'
+
+# 清单中记录全部取值的筛选维度，用于判断仪表盘的筛选条件是否为“全选”
+FILTER_DIMENSIONS = ['所属区域', '省份', '物料类别', '销售人员', '经销商名称']
+
+
+def dataset_signature(store):
+    """数据集内容签名：行数、金额合计和月份列表，用于判断预计算结果是否对应当前数据"""
+    payload = json.dumps([
+        len(store.material_data), len(store.sales_data), len(store.distributor_data),
+        round(float(store.material_data['物料成本'].sum()), 2),
+        round(float(store.sales_data['销售金额'].sum()), 2),
+        sorted(map(str, store.material_data['月份名'].unique()))
+    ], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class SliceContext:
+    """一个筛选切片上的数据
+
+    筛选与仪表盘侧边栏相同：经 DatasetStore.select 按切片条件和最新月份求物料、销售和经销商数据的位图，
+    物料类别只作用于物料数据，经销商数据与筛选后的销售数据一致。只依赖数据集的指标通过 store 取完整数据。
+    """
+
+    def __init__(self, store, filters, month):
+        self.store = store
+        self.material_selection, self.sales_selection, self.distributor_selection = store.select(
+            {**filters, '月份名': [month]})
+
+
+# 预计算指标：名称与仪表盘 DashboardView.memoize 使用的计算名称一致，值为 SliceContext -> DataFrame
+PRECOMPUTED_METRICS = {
+    '关键指标': lambda ctx: compute_kpis(ctx.material_selection, ctx.sales_selection),
+    '客户价值分层': lambda ctx: compute_segment_counts(ctx.distributor_selection.frame),
+    '物料类别投入': lambda ctx: compute_category_cost(ctx.material_selection.frame),
+    '月度销售趋势': lambda ctx: compute_monthly_sales(ctx.store.cube),
+    '月度ROI趋势': lambda ctx: ctx.store.cube.monthly(),
+    '物料ROI': lambda ctx: compute_material_roi(ctx.store.attribution),
+    '物料类别ROI': lambda ctx: compute_category_roi(ctx.store.attribution),
+    '物料组合效能': lambda ctx: compute_material_combinations(
+        ctx.store.cube.rollup('material', ['客户代码', '物料类别']), ctx.store.distributor_data),
+    '物料多样性水平': lambda ctx: compute_diversity_metrics(ctx.store.distributor_data),
+    '高频产品组合': lambda ctx: compute_product_bundles(ctx.store.material_data, ctx.store.distributor_data),
+    '产品物料亲和度': lambda ctx: compute_product_material_affinity(ctx.store.material_data, ctx.store.sales_data)
+}
+
+# 仪表盘按侧边栏筛选条件查询的指标（memoize 带 filters），只依赖最新月份，逐切片预计算；
+# 查询时月份必须与预计算时一致。其余指标只依赖数据集（memoize 不带 filters），只预计算全部数据切片
+MONTHLY_METRICS = {'关键指标', '客户价值分层', '物料类别投入'}
+
+
+def _partition_value(value):
+    """分区目录名中的取值：只转义百分号和路径分隔符（URI 编码，可被 Hive 分区读取还原）"""
+    return str(value).replace('%', '%25').replace('/', '%2F').replace('\\', '%5C')
+
+
+def partition_path(root, metric, dimension, value):
+    """单个指标、单个切片的 Parquet 文件路径"""
+    return os.path.join(root, metric, f"维度={_partition_value(dimension)}", f"取值={_partition_value(value)}",
+                        'part-0.parquet')
+
+
+def slice_filters(dimension, value):
+    """切片对应的筛选条件"""
+    return {} if dimension == ALL_SLICE else {dimension: [value]}
+
+
+def dataset_slices(store, dimensions):
+    """全部数据切片加上各维度每个取值的切片"""
+    slices = [(ALL_SLICE, ALL_SLICE)]
+    for dimension in dimensions:
+        slices.extend((dimension, value) for value in sorted(store.cube.material[dimension].unique()))
+    return slices
+
+
+class PrecomputedResults:
+    """预计算结果的只读访问
+
+    lookup 把仪表盘某个计算依赖的筛选条件映射到切片：依赖的维度都全选时取全部数据切片，
+    只有一个切片维度选中单个取值、其余全选时取该取值的切片，其他组合（以及月份不一致）视为未命中。
+    只依赖数据集的指标不带筛选条件查询，对应全部数据切片。
+    """
+
+    def __init__(self, root, manifest):
+        self.root = root
+        self.manifest = manifest
+        self.dimensions = {col: set(values) for col, values in manifest['dimensions'].items()}
+        self.slice_dimensions = {dimension for dimension, _ in manifest['slices'] if dimension != ALL_SLICE}
+        self.metrics = set(manifest['metrics'])
+
+    @classmethod
+    def open(cls, root):
+        """读取输出目录的清单，目录或清单不存在时返回 None"""
+        try:
+            with open(os.path.join(root, MANIFEST_FILE), encoding='utf-8') as f:
+                return cls(root, json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def matches(self, store):
+        return self.manifest['signature'] == dataset_signature(store)
+
+    def read(self, metric, dimension=ALL_SLICE, value=ALL_SLICE):
+        """读取一个切片的指标结果"""
+        return pd.read_parquet(partition_path(self.root, metric, dimension, value))
+
+    def resolve(self, metric, selection):
+        """筛选条件对应的切片 (维度, 取值)，无对应切片时返回 None"""
+        matched = (ALL_SLICE, ALL_SLICE)
+        if metric not in MONTHLY_METRICS:
+            return matched if not selection else None
+        for col, values in selection.items():
+            if col == '月份名':
+                if values != self.manifest['month']:
+                    return None
+                continue
+            values = set(values) if isinstance(values, (list, tuple)) else {values}
+            if values == self.dimensions.get(col):
+                continue
+            if len(values) != 1 or col not in self.slice_dimensions or matched[0] != ALL_SLICE:
+                return None
+            matched = (col, next(iter(values)))
+        return matched
+
+    def lookup(self, metric, selection):
+        """返回命中切片的指标结果，未预计算或未命中时返回 None"""
+        if metric not in self.metrics:
+            return None
+        matched = self.resolve(metric, selection)
+        if matched is None:
+            return None
+        try:
+            return self.read(metric, *matched)
+        except (OSError, ImportError, ValueError):
+            return None
+
+
+# 工作进程内的数据集（由 _init_worker 构建一次，供该进程处理的所有切片使用）
+_WORKER_STORE = None
+
+
+def _init_worker(frames):
+    global _WORKER_STORE
+    _WORKER_STORE = DatasetStore(*frames)
+
+
+def _compute_slice(task):
+    """计算一个切片的全部指标并写入 Parquet，返回各指标行数和耗时"""
+    root, dimension, value, month, metrics = task
+    start = time.perf_counter()
+    ctx = SliceContext(_WORKER_STORE, slice_filters(dimension, value), month)
+    rows = {}
+    # 只依赖数据集的指标只在全部数据切片上计算
+    for metric in (metrics if dimension == ALL_SLICE else [m for m in metrics if m in MONTHLY_METRICS]):
+        result = PRECOMPUTED_METRICS[metric](ctx)
+        path = partition_path(root, metric, dimension, value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        result.to_parquet(path)
+        rows[metric] = len(result)
+    return dimension, value, rows, time.perf_counter() - start
+
+
+def precompute(store, output, dimensions=None, metrics=None, workers=None):
+    """按切片并行计算指标并写入 output，返回各切片的行数和耗时
+
+    结果先写入临时目录，全部完成后再替换 output。
+    """
+    dimensions = PRECOMPUTED_SLICE_DIMENSIONS if dimensions is None else dimensions
+    metrics = list(PRECOMPUTED_METRICS) if metrics is None else metrics
+    month = sorted(store.cube.material['月份名'].unique())[-1]
+    slices = dataset_slices(store, dimensions)
+
+    staging = output.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    start = time.perf_counter()
+    tasks = [(staging, dimension, value, month, metrics) for dimension, value in slices]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store.frames(),)) as pool:
+        results = list(pool.map(_compute_slice, tasks))
+    seconds = time.perf_counter() - start
+
+    manifest = {
+        'created': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'signature': dataset_signature(store),
+        'month': str(month),
+        'dimensions': {
+            col: sorted(map(str, (store.distributor_data if col == '经销商名称' else store.cube.material)[col].unique()))
+            for col in FILTER_DIMENSIONS
+        },
+        'slices': [[str(dimension), str(value)] for dimension, value in slices],
+        'metrics': metrics,
+        'seconds': round(seconds, 2)
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    # 替换旧结果：先移走旧目录再改名，读取方最多看到一瞬间的目录缺失，不会看到新旧混合的结果
+    retired = output.rstrip(os.sep) + '.old'
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(output):
+        os.replace(output, retired)
+    os.replace(staging, output)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    summary = pd.DataFrame([
+        {'维度': dimension, '取值': value, **rows, '耗时(秒)': round(slice_seconds, 3)}
+        for dimension, value, rows, slice_seconds in results
+    ])
+    return summary, seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='precomputed')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--sample', action='store_true', help='使用示例数据（与仪表盘的示例数据模式对应）')
+    parser.add_argument('--dimensions', nargs='*', default=PRECOMPUTED_SLICE_DIMENSIONS,
+                        choices=PRECOMPUTED_SLICE_DIMENSIONS)
+    parser.add_argument('--metrics', nargs='+', default=list(PRECOMPUTED_METRICS), choices=list(PRECOMPUTED_METRICS))
+    args = parser.parse_args()
+
+    store = DatasetStore(*load_data(sample_data=args.sample,
+                                    on_error=lambda e: print(f"加载数据时出错: {e}，使用示例数据", file=sys.stderr)))
+    summary, seconds = precompute(store, args.output, args.dimensions, args.metrics, args.workers)
+    print(summary.to_string(index=False))
+    print(f"{len(summary)} 个切片、{len(args.metrics)} 个指标，并行计算总耗时: {seconds:.2f} 秒（{args.workers} 个进程）")
+    print(f"结果已写入 {args.output}")
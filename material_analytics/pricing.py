@@ -0,0 +1,146 @@
+"""物料单价历史：按生效月份分版本的单价表与 as-of 单价匹配"""
+
+import numpy as np
+import pandas as pd
+
+# 单价表中可选的生效月份列：该行单价从这个月份起生效，直到同一物料的下一个生效月份；
+# 单价表没有此列或取值为空时，该行单价对所有月份有效（即原来的单一单价表）
+PRICE_EFFECTIVE_COLUMN = '生效月份'
+
+# 复合键中月份序号的跨度（年*12+月 远小于此值）
+_MONTH_SPAN = 1 << 20
+
+
+def month_ordinals(dates):
+    """日期转为月份序号（年*12+月-1），缺失值记为 0，即早于任何月份"""
+    dates = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates)))
+    ordinals = np.asarray(dates.year * 12 + dates.month - 1, dtype=np.float64)
+    return np.nan_to_num(ordinals, nan=0).astype(np.int64)
+
+
+class PriceHistory:
+    """按 (物料代码, 生效月份) 排序的单价数组索引
+
+    materials 为排序后的物料代码，每个单价版本的键为 物料序号 * _MONTH_SPAN + 生效月份序号，键数组有序。
+    as-of 匹配对每个 (物料代码, 发运月份) 做一次 searchsorted，取生效月份不晚于发运月份的最后一个版本；
+    发运月份早于该物料最早的生效月份时使用最早的版本，单价表中没有的物料视为缺失。
+    同一物料同一生效月份有多行时以表中靠后的行为准。
+    """
+
+    def __init__(self, materials, keys, prices, categories, mean_price):
+        self.materials = materials
+        self.keys = keys
+        self.prices = prices
+        self.categories = categories
+        self.mean_price = mean_price
+        self._material_index = pd.Index(materials)
+
+    @classmethod
+    def from_table(cls, material_price):
+        """由物料单价表（物料代码、单价（元）、物料类别，可选生效月份）构建索引"""
+        ids, materials = pd.factorize(material_price['物料代码'], sort=True)
+        if PRICE_EFFECTIVE_COLUMN in material_price.columns:
+            months = month_ordinals(material_price[PRICE_EFFECTIVE_COLUMN])
+        else:
+            months = np.zeros(len(material_price), dtype=np.int64)
+        keys = ids.astype(np.int64) * _MONTH_SPAN + months
+
+        # 稳定排序后同一键只保留最后一行，物料代码缺失的行丢弃
+        order = np.argsort(keys, kind='stable')
+        order = order[ids[order] >= 0]
+        sorted_keys = keys[order]
+        order = order[np.append(sorted_keys[1:] != sorted_keys[:-1], True)]
+
+        return cls(
+            np.asarray(materials, dtype=object),
+            keys[order],
+            material_price['单价（元）'].to_numpy(dtype=np.float64)[order],
+            material_price['物料类别'].to_numpy(dtype=object)[order],
+            material_price['单价（元）'].mean()
+        )
+
+    def versions(self):
+        """全部单价版本：物料代码、生效月份序号、单价（元）、物料类别"""
+        return pd.DataFrame({
+            '物料代码': self.materials[self.keys // _MONTH_SPAN],
+            '生效月份序号': self.keys % _MONTH_SPAN,
+            '单价（元）': self.prices,
+            '物料类别': self.categories
+        })
+
+    def positions(self, codes, months):
+        """每个 (物料代码, 月份序号) 匹配到的版本位置，单价表中没有的物料为 -1"""
+        ids = self._material_index.get_indexer(codes).astype(np.int64)
+        if len(self.keys) == 0:
+            return np.full(len(ids), -1)
+        pos = np.searchsorted(self.keys, ids * _MONTH_SPAN + months, side='right') - 1
+        # 早于该物料最早的生效月份时，pos 落在前一个物料上（或为 -1），下一个位置即该物料最早的版本
+        before = (pos < 0) | (self.keys[np.maximum(pos, 0)] // _MONTH_SPAN != ids)
+        pos = np.where(before, pos + 1, pos)
+        pos[ids < 0] = -1
+        return pos
+
+    def apply(self, material_data, rows=None):
+        """按发运月份为物料明细匹配单价，写入 物料代码、单价（元）、物料类别 和 物料成本 列
+
+        缺失单价用单价表的平均单价填充。rows 为需要重算的行号（如单价修改后受影响的行），
+        给出时只改写这些行，其余行保持不变；默认重算全部行。
+        """
+        codes = material_data['产品代码'].to_numpy(dtype=object)
+        months = month_ordinals(material_data['发运月份'])
+        full = rows is None
+        rows = np.arange(len(material_data)) if full else np.asarray(rows, dtype=np.int64)
+
+        pos = self.positions(codes[rows], months[rows])
+        matched = pos >= 0
+        safe = np.where(matched, pos, 0)
+        prices = np.where(matched, self.prices[safe], np.nan)
+        values = {
+            '物料代码': np.where(matched, codes[rows], np.nan),
+            '单价（元）': np.where(np.isnan(prices), self.mean_price, prices),
+            '物料类别': np.where(matched, self.categories[safe], np.nan)
+        }
+        quantities = material_data['求和项:数量（箱）'].to_numpy()[rows]
+        values['物料成本'] = quantities * values['单价（元）']
+
+        for col, column_values in values.items():
+            if full:
+                material_data[col] = column_values
+                continue
+            if col in material_data.columns:
+                column = material_data[col].to_numpy(dtype=column_values.dtype, copy=True)
+            else:
+                column = np.full(len(material_data), np.nan, dtype=column_values.dtype)
+            column[rows] = column_values
+            material_data[col] = column
+        return material_data
+
+    def changed_materials(self, previous):
+        """与旧单价索引相比单价或类别有变化的物料 {物料代码: 起始月份序号}
+
+        起始月份序号之前的月份单价不变；变化涉及物料最早的版本时，更早的月份同样沿用该版本，起始月份序号记为 0。
+        """
+        merged = pd.merge(previous.versions(), self.versions(), on=['物料代码', '生效月份序号'],
+                          how='outer', suffixes=('_旧', '_新'), indicator=True)
+        changed = merged['_merge'] != 'both'
+        for col in ['单价（元）', '物料类别']:
+            old, new = merged[f"{col}_旧"], merged[f"{col}_新"]
+            changed |= (old != new) & ~(old.isna() & new.isna())
+
+        first_version = merged.groupby('物料代码')['生效月份序号'].transform('min')
+        start = merged['生效月份序号'].where(merged['生效月份序号'] > first_version, 0)
+        return start[changed].groupby(merged.loc[changed, '物料代码']).min().to_dict()
+
+    def affected_rows(self, material_data, previous, changes=None):
+        """从旧单价索引换成本索引后单价可能变化的行号
+
+        包括单价变化的物料在起始月份及之后的行；平均单价变化时还包括单价表中没有的物料（按平均单价填充）的行。
+        changes: 已求得的 changed_materials(previous)，逐个分区调用时避免重复比较
+        """
+        changes = self.changed_materials(previous) if changes is None else changes
+        codes = pd.Series(material_data['产品代码'].to_numpy(dtype=object))
+        start = codes.map(changes)
+        affected = start.notna().to_numpy() & (month_ordinals(material_data['发运月份']) >= start.fillna(0).to_numpy())
+        if not np.isclose(self.mean_price, previous.mean_price, equal_nan=True):
+            affected |= self._material_index.get_indexer(codes) < 0
+        return np.flatnonzero(affected)
@@ -0,0 +1,222 @@
+"""数据处理：日期列、维度字典编码、经销商汇总与客户价值分层"""
+
+import numpy as np
+import pandas as pd
+
+from .pricing import PriceHistory
+
+
+def assign_value_segments(distributor_data, by=None, thresholds=None):
+    """向量化计算客户价值分层
+
+    销售额的75分位数和中位数阈值只计算一次，再用数组运算为所有行分配分层；
+    by 为分组列（如 ['月份名'] 或 ['月份名', '所属区域']）时按组分别计算阈值。
+    thresholds: 已知的全量 (75分位数, 中位数) 阈值（如增量导入时由各月汇总求得），给出时不再从数据计算
+    """
+    sales = distributor_data['销售总额']
+    roi = distributor_data['ROI'].to_numpy()
+
+    if thresholds is not None:
+        upper, median = thresholds
+    elif by:
+        grouped = sales.groupby([distributor_data[col] for col in by], dropna=False, observed=True)
+        upper = grouped.transform('quantile', q=0.75).to_numpy()
+        median = grouped.transform('median').to_numpy()
+    else:
+        upper = sales.quantile(0.75)
+        median = sales.median()
+
+    sales = sales.to_numpy()
+    segments = np.select(
+        [
+            (roi >= 2.0) & (sales > upper),
+            (roi >= 1.0) & (sales > median),
+            roi >= 1.0
+        ],
+        ['高价值客户', '成长型客户', '稳定型客户'],
+        default='低效型客户'
+    )
+    return pd.Series(segments, index=distributor_data.index, dtype=object)
+
+
+def add_date_columns(df):
+    """根据发运月份添加月份、年份、月份名、季度和月度名称列
+
+    发运月份的取值只有少数几个月，先在唯一值上计算再按编码展开，避免逐行格式化日期。
+    """
+    codes, uniques = pd.factorize(df['发运月份'], use_na_sentinel=False)
+    uniques = pd.DatetimeIndex(uniques)
+    df['月份'] = uniques.month.to_numpy()[codes]
+    df['年份'] = uniques.year.to_numpy()[codes]
+    df['月份名'] = uniques.strftime('%Y-%m').to_numpy(dtype=object)[codes]
+    df['季度'] = uniques.quarter.to_numpy()[codes]
+    df['月度名称'] = uniques.strftime('%m月').to_numpy(dtype=object)[codes]
+    return df
+
+
+# 字典编码的维度列：物料、销售和经销商数据共享同一套分类字典，编码在三张表之间一致
+# 按这些列分组时需指定 observed=True（否则会展开全部分类组合）；pandas 1.5 在 observed=True 时不按分类排序，
+# 需要有序结果时追加 sort_index()，字典已排序，因此顺序与字符串列分组一致
+DIMENSION_COLUMNS = ['客户代码', '经销商名称', '所属区域', '省份', '销售人员', '产品代码', '产品名称', '物料类别', '月份名']
+
+
+def build_dimension_dtypes(*frames):
+    """为各维度列构建共享的分类字典
+
+    字典取所有数据中出现过的取值并排序，使按编码分组的结果顺序与字符串列一致；
+    取值类型混杂无法排序时保留出现顺序。
+    """
+    dtypes = {}
+    for col in DIMENSION_COLUMNS:
+        present = [df[col] for df in frames if col in df.columns]
+        if not present:
+            continue
+        values = pd.Index(np.concatenate([
+            np.asarray(series.dropna().unique(), dtype=object) for series in present
+        ])).unique()
+        try:
+            values = values.sort_values()
+        except TypeError:
+            pass
+        dtypes[col] = pd.CategoricalDtype(values)
+    return dtypes
+
+
+def encode_dimensions(df, dtypes):
+    """按共享字典将维度列转换为分类类型（已是同一字典时不做转换）
+
+    无序分类类型的相等比较忽略类别顺序，因此分类列按类别序列逐一核对，顺序不同时重新编码。
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype) and isinstance(df[col].dtype, pd.CategoricalDtype):
+            if not df[col].cat.categories.equals(dtype.categories):
+                df[col] = df[col].cat.set_categories(dtype.categories)
+        elif df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def prepare_material(material_data, material_price):
+    """物料明细：日期列和物料成本
+
+    按发运月份从物料单价表中匹配当时生效的单价（单价表可带生效月份列，见 PriceHistory），
+    缺失单价用平均单价填充。
+    """
+    # 确保日期列为日期类型
+    material_data['发运月份'] = pd.to_datetime(material_data['发运月份'])
+    add_date_columns(material_data)
+
+    # 计算物料成本
+    if '物料成本' not in material_data.columns:
+        material_data = PriceHistory.from_table(material_price).apply(material_data.reset_index(drop=True))
+    return material_data
+
+
+def prepare_sales(sales_data):
+    """销售明细：日期列和销售金额"""
+    sales_data['发运月份'] = pd.to_datetime(sales_data['发运月份'])
+    add_date_columns(sales_data)
+
+    # 计算销售金额
+    if '销售金额' not in sales_data.columns:
+        sales_data['销售金额'] = sales_data['求和项:数量（箱）'] * sales_data['求和项:单价（箱）']
+    return sales_data
+
+
+def aggregate_distributors(material_data, sales_data):
+    """按经销商和月份汇总物料总成本、销售总额，计算ROI和物料销售比率"""
+    # 按经销商和月份计算物料成本总和
+    material_cost_by_distributor = material_data.groupby(['客户代码', '经销商名称', '月份名', '销售人员'],
+                                                         observed=True)['物料成本'].sum().sort_index().reset_index()
+    material_cost_by_distributor.rename(columns={'物料成本': '物料总成本'}, inplace=True)
+
+    # 按经销商和月份计算销售总额
+    sales_by_distributor = sales_data.groupby(['客户代码', '经销商名称', '月份名', '销售人员'],
+                                              observed=True)['销售金额'].sum().sort_index().reset_index()
+    sales_by_distributor.rename(columns={'销售金额': '销售总额'}, inplace=True)
+
+    # 合并物料成本和销售数据
+    distributor_data = pd.merge(
+        material_cost_by_distributor,
+        sales_by_distributor,
+        on=['客户代码', '经销商名称', '月份名', '销售人员'],
+        how='outer'
+    ).fillna({'物料总成本': 0, '销售总额': 0})
+
+    # 计算ROI
+    distributor_data['ROI'] = np.where(
+        distributor_data['物料总成本'] > 0,
+        distributor_data['销售总额'] / distributor_data['物料总成本'],
+        0
+    )
+
+    # 计算物料销售比率
+    distributor_data['物料销售比率'] = (
+                                               distributor_data['物料总成本'] / distributor_data['销售总额'].replace(0,
+                                                                                                                     np.nan)
+                                       ) * 100
+    distributor_data['物料销售比率'].fillna(0, inplace=True)
+    return distributor_data
+
+
+def compute_material_diversity(material_data):
+    """各经销商每月使用的物料种类数"""
+    material_diversity = material_data.groupby(['客户代码', '月份名'], observed=True)[
+        '产品代码'].nunique().sort_index().reset_index()
+    material_diversity.rename(columns={'产品代码': '物料多样性'}, inplace=True)
+    return material_diversity
+
+
+def add_customer_regions(distributor_data, customers):
+    """按客户代码补齐经销商数据的区域和省份列
+
+    customers: 含 客户代码、所属区域、省份 的明细（如物料数据），去重后作为映射表
+    """
+    # 添加区域信息（分层可按区域计算阈值，需先补齐）
+    if '所属区域' not in distributor_data.columns:
+        region_map = customers[['客户代码', '所属区域']].drop_duplicates().set_index('客户代码')
+        distributor_data['所属区域'] = distributor_data['客户代码'].map(region_map['所属区域'])
+
+    # 添加省份信息
+    if '省份' not in distributor_data.columns:
+        province_map = customers[['客户代码', '省份']].drop_duplicates().set_index('客户代码')
+        distributor_data['省份'] = distributor_data['客户代码'].map(province_map['省份'])
+    return distributor_data
+
+
+def process_data(material_data, sales_data, material_price, segment_by=None):
+    """处理和准备数据
+
+    segment_by: 客户价值分层阈值的分组列，默认全量数据统一阈值
+    """
+
+    # 创建月份和年份列，计算物料成本和销售金额
+    material_data = prepare_material(material_data, material_price)
+    sales_data = prepare_sales(sales_data)
+
+    # 维度列字典编码，之后的分组、合并和筛选都基于整数编码
+    dimension_dtypes = build_dimension_dtypes(material_data, sales_data)
+    for df in [material_data, sales_data]:
+        encode_dimensions(df, dimension_dtypes)
+
+    # 经销商月度汇总，补齐区域和省份
+    distributor_data = add_customer_regions(aggregate_distributors(material_data, sales_data), material_data)
+
+    # 经销商价值分层
+    distributor_data['客户价值分层'] = assign_value_segments(distributor_data, by=segment_by)
+
+    # 合并物料使用多样性到经销商数据
+    distributor_data = pd.merge(
+        distributor_data,
+        compute_material_diversity(material_data),
+        on=['客户代码', '月份名'],
+        how='left'
+    )
+    distributor_data['物料多样性'].fillna(0, inplace=True)
+
+    # 映射得到的区域、省份列统一回共享字典
+    encode_dimensions(distributor_data, dimension_dtypes)
+
+    return material_data, sales_data, material_price, distributor_data
@@ -0,0 +1,211 @@
+"""物料组合与客户优化建议"""
+
+import numpy as np
+import pandas as pd
+
+from .metrics import cooccurrence_itemsets
+
+
+def high_roi_category_shares(material_data, sales_data, roi_threshold=2.0):
+    """一次分组计算全部高ROI（经销商, 月份）记录的物料类别成本占比
+
+    返回 (records, shares, overall_roi)：
+    records 为 ROI 超过阈值的记录（客户代码、月份名、物料成本、销售金额、ROI）；
+    shares 为与 records 行对齐的 记录 × 物料类别 成本占比矩阵（百分比，未使用的类别为0）；
+    overall_roi 为全部记录的整体ROI，作为估算销售提升的基准。
+    """
+    # 按经销商、月份和物料类别汇总成本，展开为 (经销商, 月份) × 物料类别 矩阵
+    cost_matrix = material_data.groupby(['客户代码', '月份名', '物料类别'], observed=True)[
+        '物料成本'].sum().unstack('物料类别', fill_value=0).sort_index().sort_index(axis=1)
+    cost_matrix.columns = cost_matrix.columns.astype(object)
+
+    # 合并物料和销售数据
+    merged_data = pd.merge(
+        cost_matrix.sum(axis=1).rename('物料成本').reset_index(),
+        sales_data.groupby(['客户代码', '月份名'], observed=True)['销售金额'].sum().sort_index().reset_index(),
+        on=['客户代码', '月份名'],
+        how='inner'
+    )
+
+    # 计算ROI
+    merged_data['ROI'] = merged_data['销售金额'] / merged_data['物料成本']
+    overall_roi = merged_data['销售金额'].sum() / merged_data['物料成本'].sum() if len(merged_data) > 0 else 0
+
+    # 找出高ROI的记录
+    records = merged_data[merged_data['ROI'] > roi_threshold].reset_index(drop=True)
+    shares = cost_matrix.reindex(pd.MultiIndex.from_frame(records[['客户代码', '月份名']]))
+    shares = shares.div(shares.sum(axis=1), axis=0).fillna(0) * 100
+    return records, shares.reset_index(drop=True), overall_roi
+
+
+def get_material_combination_recommendations(material_data, sales_data, distributor_data, product_bundles=None):
+    """生成基于历史数据分析的物料组合优化建议
+
+    使用全部高ROI（ROI>2）记录：每条记录取成本占比前3的物料类别作为主要物料类别，
+    类别对的出现次数和ROI合计由主要类别指示矩阵的矩阵乘积一次求出。
+    预计销售提升按组合ROI相对整体ROI的提升幅度估算，结果确定、可缓存。
+    product_bundles: compute_product_bundles 的结果，提供时每条推荐取产品全部属于其核心类别、
+    提升度大于1且平均ROI最高的高频产品组合作为最佳产品组合，没有匹配的组合时使用默认说明。
+    """
+    records, shares, overall_roi = high_roi_category_shares(material_data, sales_data)
+
+    if records.empty:
+        return [{"推荐名称": "暂无足够数据生成物料组合优化建议",
+                 "预期ROI": "N/A",
+                 "适用场景": "N/A",
+                 "最佳搭配物料": "N/A",
+                 "适用客户": "N/A",
+                 "核心类别": []}]
+
+    categories = np.array(shares.columns, dtype=object)
+    share_values = shares.to_numpy()
+    roi_values = records['ROI'].to_numpy()
+
+    # 每条记录按占比降序的前3个已使用类别
+    top_order = np.argsort(-share_values, axis=1, kind='stable')[:, :3]
+    top_used = np.take_along_axis(share_values, top_order, axis=1) > 0
+    main_categories = np.zeros(share_values.shape, dtype=bool)
+    np.put_along_axis(main_categories, top_order, top_used, axis=1)
+
+    # 类别对的出现次数与平均ROI（共现矩阵乘积）
+    pair_stats = cooccurrence_itemsets(main_categories, roi_values, max_k=2, min_support=1)
+    pair_stats = pair_stats.sort_values('平均ROI', ascending=False, kind='stable').head(3)
+    best_pairs = [(tuple(categories[list(items)]), avg_roi)
+                  for items, avg_roi in zip(pair_stats['组合'], pair_stats['平均ROI'])]
+
+    def expected_uplift(roi):
+        """组合ROI相对整体ROI的提升幅度"""
+        return f"{max(roi / overall_roi - 1, 0) * 100:.0f}%" if overall_roi > 0 else "N/A"
+
+    # 最佳产品组合：正相关（提升度>1）的高频产品组合按平均ROI排序，附带各组合产品所属的物料类别
+    candidate_bundles = []
+    if product_bundles is not None and len(product_bundles) > 0:
+        positive = product_bundles[product_bundles['提升度'] > 1].sort_values('平均ROI', ascending=False, kind='stable')
+        product_category = material_data[['产品代码', '物料类别']].drop_duplicates('产品代码').astype(object).set_index(
+            '产品代码')['物料类别']
+        candidate_bundles = [(name.split(' + '), set(product_category.reindex(list(codes))))
+                             for name, codes in zip(positive['产品组合'], positive['组合'])]
+    used_bundles = set()
+
+    def best_bundle(core_categories, default):
+        """产品全部属于核心类别的最佳组合，优先未被其他推荐使用的组合"""
+        matches = [i for i, (_, bundle_categories) in enumerate(candidate_bundles)
+                   if bundle_categories <= set(core_categories)]
+        if not matches:
+            return default
+        choice = next((i for i in matches if i not in used_bundles), matches[0])
+        used_bundles.add(choice)
+        return candidate_bundles[choice][0]
+
+    # 综合评分：ROI × log(1 + 销售金额)
+    scores = roi_values * np.log1p(records['销售金额'].to_numpy())
+    top_records = np.argsort(-scores, kind='stable')[:3]
+
+    # 生成推荐
+    recommendations = []
+    used_categories = set()
+
+    # 基于最佳组合的推荐
+    for i, r in enumerate(top_records, 1):
+        main_cats = categories[top_order[r][top_used[r]]][:2].tolist()  # 取前两个主要类别
+        main_cats_str = '、'.join(main_cats)
+        roi = roi_values[r]
+
+        for cat in main_cats:
+            used_categories.add(cat)
+
+        recommendations.append({
+            "推荐名称": f"推荐物料组合{i}: 以【{main_cats_str}】为核心",
+            "预期ROI": f"{roi:.2f}",
+            "适用场景": "终端陈列与促销活动" if i == 1 else "长期品牌建设" if i == 2 else "快速促单与客户转化",
+            "最佳搭配物料": "主要展示物料 + 辅助促销物料" if i == 1 else "品牌宣传物料 + 高端礼品" if i == 2 else "促销物料 + 实用赠品",
+            "适用客户": "所有客户，尤其高价值客户" if i == 1 else "高端市场客户" if i == 2 else "大众市场客户",
+            "核心类别": main_cats,
+            "最佳产品组合": best_bundle(main_cats, ["高端产品", "中端产品"]),
+            "预计销售提升": expected_uplift(roi)
+        })
+
+    # 基于最佳类别对的推荐
+    for pair, avg_roi in best_pairs:
+        if pair[0] in used_categories and pair[1] in used_categories:
+            continue  # 跳过已经在其他推荐中使用的类别对
+        i = len(recommendations) + 1
+
+        recommendations.append({
+            "推荐名称": f"推荐物料组合{i}: 【{pair[0]}】+【{pair[1]}】黄金搭配",
+            "预期ROI": f"{avg_roi:.2f}",
+            "适用场景": "综合营销活动",
+            "最佳搭配物料": f"{pair[0]}为主，{pair[1]}为辅，比例约7:3",
+            "适用客户": "适合追求高效益的客户",
+            "核心类别": list(pair),
+            "最佳产品组合": best_bundle(pair, ["中端产品", "入门产品"]),
+            "预计销售提升": expected_uplift(avg_roi)
+        })
+
+        for cat in pair:
+            used_categories.add(cat)
+
+    return recommendations
+
+
+def get_customer_optimization_suggestions(distributor_data):
+    """根据客户分层和ROI生成差异化物料分发策略"""
+
+    # 按客户价值分层的统计
+    segment_stats = distributor_data.groupby('客户价值分层').agg({
+        'ROI': 'mean',
+        '物料总成本': 'mean',
+        '销售总额': 'mean',
+        '客户代码': 'nunique'
+    }).reset_index()
+
+    segment_stats.rename(columns={'客户代码': '客户数量'}, inplace=True)
+
+    # 为每个客户细分生成优化建议
+    suggestions = {}
+
+    # 高价值客户建议
+    high_value = segment_stats[segment_stats['客户价值分层'] == '高价值客户']
+    if not high_value.empty:
+        suggestions['高价值客户'] = {
+            '建议策略': '维护与深化',
+            '物料配比': '全套高质量物料',
+            '投放增减': '维持或适度增加(5-10%)',
+            '物料创新': '优先试用新物料',
+            '关注重点': '保持ROI稳定性，避免过度投放'
+        }
+
+    # 成长型客户建议
+    growth = segment_stats[segment_stats['客户价值分层'] == '成长型客户']
+    if not growth.empty:
+        suggestions['成长型客户'] = {
+            '建议策略': '精准投放',
+            '物料配比': '聚焦高效转化物料',
+            '投放增减': '有条件增加(10-15%)',
+            '物料创新': '定期更新物料组合',
+            '关注重点': '提升销售额规模，保持ROI'
+        }
+
+    # 稳定型客户建议
+    stable = segment_stats[segment_stats['客户价值分层'] == '稳定型客户']
+    if not stable.empty:
+        suggestions['稳定型客户'] = {
+            '建议策略': '效率优化',
+            '物料配比': '优化高ROI物料占比',
+            '投放增减': '维持不变',
+            '物料创新': '测试新物料效果',
+            '关注重点': '提高物料使用效率，挖掘增长点'
+        }
+
+    # 低效型客户建议
+    low_value = segment_stats[segment_stats['客户价值分层'] == '低效型客户']
+    if not low_value.empty:
+        suggestions['低效型客户'] = {
+            '建议策略': '控制与改进',
+            '物料配比': '减少低效物料',
+            '投放增减': '减少(20-30%)',
+            '物料创新': '暂缓新物料试用',
+            '关注重点': '诊断低效原因，培训后再投放'
+        }
+
+    return suggestions
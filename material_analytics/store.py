@@ -0,0 +1,561 @@
+"""只读数据集、筛选索引、多维聚合与计算结果缓存"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .processing import encode_dimensions
+
+
+class FilterIndex:
+    """维度筛选倒排索引
+
+    加载时为每个维度列按取值编码对行号做一次稳定排序，记录每个取值在排序结果中的起止位置，
+    每个取值对应一段有序行号列表。筛选时把选中取值的行号写入布尔位图，各维度位图按位与求交，
+    不再逐次对整列执行 isin；选中了某维度全部取值（且无缺失值）时直接跳过该维度。
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.postings = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codes, categories = df[col].array.codes, df[col].cat.categories
+            else:
+                codes, categories = pd.factorize(df[col])
+                categories = pd.Index(categories)
+            # 编码整体加1，0号位置留给缺失值
+            slots = codes.astype(np.int64) + 1
+            counts = np.bincount(slots, minlength=len(categories) + 1)
+            self.postings[col] = (
+                categories,
+                np.argsort(slots, kind='stable'),
+                np.concatenate([[0], np.cumsum(counts)])
+            )
+
+    def _column_mask(self, col, values):
+        """返回单个维度的位图，选中全部取值时返回 None"""
+        categories, order, offsets = self.postings[col]
+        slots = np.unique(categories.get_indexer(pd.Index(list(values))) + 1)
+        slots = slots[slots > 0]
+        counts = np.diff(offsets)
+        if counts[0] == 0 and np.count_nonzero(counts[slots]) == np.count_nonzero(counts):
+            return None
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for slot in slots:
+            mask[order[offsets[slot]:offsets[slot + 1]]] = True
+        return mask
+
+    def rows(self, col, value):
+        """该维度取某个值的行号（升序），不构造位图"""
+        categories, order, offsets = self.postings[col]
+        slot = categories.get_indexer([value])[0] + 1
+        return order[offsets[slot]:offsets[slot + 1]] if slot > 0 else order[0:0]
+
+    def mask(self, filters=None):
+        """求各维度筛选条件的交集，返回行位图
+
+        filters: {维度列: 取值列表}，索引中不存在的维度列忽略
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for col, values in (filters or {}).items():
+            if col in self.postings:
+                column_mask = self._column_mask(col, values)
+                if column_mask is not None:
+                    mask &= column_mask
+        return mask
+
+
+class LazySelection:
+    """按需物化的筛选结果
+
+    只保存数据和行位图，图表真正需要明细时才通过 frame 生成筛选后的 DataFrame（生成一次后复用）；
+    汇总指标和取值列表直接在位图上计算，不必物化。
+    """
+
+    def __init__(self, df, mask, distributors=None):
+        self.df = df
+        self.mask = mask
+        self.distributors = distributors
+        self._frame = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            # 按行号取行：结果是独立的新数据，标签页追加派生列时不触发 SettingWithCopyWarning
+            self._frame = self.df.take(np.flatnonzero(self.mask))
+        return self._frame
+
+    def sum(self, col):
+        return self.df[col].to_numpy()[self.mask].sum()
+
+    def unique(self, col):
+        """返回选中行在该列上的取值"""
+        return self.df[col][self.mask].unique()
+
+    def nunique(self, col):
+        return self.df[col][self.mask].nunique()
+
+    def rows(self, values):
+        """选中行中一个或多个经销商的行（通过数据的经销商行区间索引，只访问这些经销商的行）"""
+        return self.distributors.rows(values, self.mask)
+
+
+class DistributorIndex:
+    """按经销商的行区间索引
+
+    数据按客户代码编码稳定排序后，每个经销商的行是连续区间，区间起止位置存入以客户代码为键的字典。
+    取某个经销商的行只需一次字典查找和一次切片，切片与数据共用底层数组、不复制，
+    耗时取决于该经销商的行数而不是全表行数。数据未按客户代码排序时先排序一次。
+    """
+
+    def __init__(self, df, col='客户代码'):
+        codes = df[col].array.codes if isinstance(df[col].dtype, pd.CategoricalDtype) else pd.factorize(df[col])[0]
+        # 缺失值编码为-1，排在最前面，不进入索引
+        if np.all(codes[1:] >= codes[:-1]):
+            self.frame, self.positions = df, np.arange(len(df))
+        else:
+            self.positions = np.argsort(codes, kind='stable')
+            self.frame, codes = df.iloc[self.positions], codes[self.positions]
+        keys, starts = np.unique(codes, return_index=True)
+        stops = np.append(starts[1:], len(codes))
+        values = df[col].iloc[self.positions[starts]] if len(starts) else []
+        self.offsets = {
+            value: (int(start), int(stop))
+            for key, value, start, stop in zip(keys, values, starts, stops) if key >= 0
+        }
+
+    def __contains__(self, value):
+        return value in self.offsets
+
+    def rows(self, values, mask=None):
+        """返回一个或多个经销商的行
+
+        values: 单个客户代码或客户代码列表；单个经销商且不带位图时返回零拷贝切片
+        mask: 原数据上的行位图（如侧边栏筛选结果），只在该经销商的行区间内取值
+        """
+        if isinstance(values, (list, tuple, set, np.ndarray, pd.Index)):
+            spans = [self.offsets[value] for value in values if value in self.offsets]
+        else:
+            spans = [self.offsets[values]] if values in self.offsets else []
+
+        parts = []
+        for start, stop in spans:
+            part = self.frame.iloc[start:stop]
+            if mask is not None:
+                part = part[mask[self.positions[start:stop]]]
+            parts.append(part)
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts) if parts else self.frame.iloc[0:0]
+
+
+class MaterialCube:
+    """物料与销售预聚合立方体
+
+    在 月份 × 经销商 × 物料类别 × 区域 × 省份 × 销售人员 粒度上预先汇总可加指标
+    （物料成本、销售金额、数量、物料种类数），各标签页通过 slice / rollup 查询，不再扫描原始明细。
+    销售明细没有物料类别，因此按物料类别的筛选只作用于物料立方体。
+    物料种类数在同一经销商-月份内跨物料类别可加（每种物料只属于一个类别）。
+    立方体行按客户代码排序，单个经销商的下钻查询通过 DistributorIndex 直接取行区间。
+    """
+
+    DIMENSIONS = ['月份名', '客户代码', '经销商名称', '物料类别', '所属区域', '省份', '销售人员']
+
+    def __init__(self, material_data, sales_data):
+        self.material = self._aggregate(material_data, {
+            '物料成本': ('物料成本', 'sum'),
+            '求和项:数量（箱）': ('求和项:数量（箱）', 'sum'),
+            '物料种类数': ('产品代码', 'nunique')
+        })
+        self.sales = self._aggregate(sales_data, {
+            '销售金额': ('销售金额', 'sum'),
+            '求和项:数量（箱）': ('求和项:数量（箱）', 'sum')
+        })
+        # 两个立方体各自的维度筛选索引和经销商行区间索引
+        self.indexes = {
+            'material': FilterIndex(self.material, self.DIMENSIONS),
+            'sales': FilterIndex(self.sales, self.DIMENSIONS)
+        }
+        self.distributors = {
+            'material': DistributorIndex(self.material),
+            'sales': DistributorIndex(self.sales)
+        }
+
+    def _aggregate(self, facts, measures):
+        """按明细中存在的维度列汇总指标"""
+        dims = [col for col in self.DIMENSIONS if col in facts.columns]
+        cube = facts.groupby(dims, dropna=False, sort=False, observed=True).agg(**measures).reset_index()
+        # sort=False 分组会按出现顺序重排分类字典，恢复为明细的共享字典
+        cube = encode_dimensions(cube, facts[dims].dtypes.to_dict())
+        # 按客户代码稳定排序，同一经销商的行连续存放
+        return cube.sort_values('客户代码', kind='stable', ignore_index=True)
+
+    def select(self, fact, filters=None):
+        """按筛选条件求立方体行位图，返回按需物化的筛选结果
+
+        fact: 'material' 或 'sales'
+        filters: {维度列: 取值列表}，立方体中不存在的维度列忽略
+        """
+        facts = self.material if fact == 'material' else self.sales
+        return LazySelection(facts, self.indexes[fact].mask(filters), self.distributors[fact])
+
+    def slice(self, fact, filters=None):
+        """返回满足筛选条件的立方体行
+
+        只按客户代码筛选时直接取经销商行区间，不扫描整个立方体。
+        """
+        if not filters:
+            return self.material if fact == 'material' else self.sales
+        if list(filters) == ['客户代码']:
+            return self.distributors[fact].rows(filters['客户代码'])
+        return self.select(fact, filters).frame
+
+    def rollup(self, fact, by, filters=None):
+        """按 by 维度汇总筛选后的指标"""
+        facts = self.slice(fact, filters)
+        by = [by] if isinstance(by, str) else list(by)
+        measures = [col for col in facts.columns if col not in self.DIMENSIONS]
+        return facts.groupby(by, observed=True)[measures].sum().sort_index().reset_index()
+
+    def monthly(self, filters=None):
+        """按月汇总物料成本和销售金额并计算ROI，按月份排序"""
+        monthly_data = pd.merge(
+            self.rollup('material', '月份名', filters)[['月份名', '物料成本']],
+            self.rollup('sales', '月份名', filters)[['月份名', '销售金额']],
+            on='月份名'
+        )
+        monthly_data['ROI'] = monthly_data['销售金额'] / monthly_data['物料成本']
+        monthly_data['月份序号'] = pd.to_datetime(monthly_data['月份名']).dt.strftime('%Y%m').astype(int)
+        return monthly_data.sort_values('月份序号')
+
+
+class SalesAttribution:
+    """按物料成本占比的销售额归因
+
+    在 经销商 × 月份 × 物料(产品代码) 粒度上汇总物料成本，用分组 transform 一次求出每种物料在
+    该经销商当月物料总成本中的占比，再把该经销商当月自己的销售额按占比分配到各物料（分配销售额）。
+    任意层级（物料、物料类别、区域、经销商、月份）的归因ROI = 分配销售额合计 ÷ 物料成本合计，
+    都由 rollup 从同一份归因明细汇总得到。没有物料投入的经销商-月份销售额不参与分配。
+    """
+
+    DIMENSIONS = ['客户代码', '经销商名称', '所属区域', '省份', '销售人员', '月份名', '产品代码', '产品名称', '物料类别']
+
+    def __init__(self, material_data, sales_data):
+        dims = [col for col in self.DIMENSIONS if col in material_data.columns]
+        facts = material_data.groupby(dims, dropna=False, sort=False, observed=True)['物料成本'].sum().reset_index()
+        facts = encode_dimensions(facts, material_data[dims].dtypes.to_dict())
+
+        # 经销商当月销售额：按 (客户代码, 月份名) 的共享字典编码组合查表
+        n_months = len(material_data['月份名'].cat.categories)
+        sales_keys = (sales_data['客户代码'].cat.codes.to_numpy().astype(np.int64) * n_months +
+                      sales_data['月份名'].cat.codes.to_numpy().astype(np.int64))
+        fact_keys = (facts['客户代码'].cat.codes.to_numpy().astype(np.int64) * n_months +
+                     facts['月份名'].cat.codes.to_numpy().astype(np.int64))
+        valid = sales_keys >= 0
+        size = int(max(sales_keys.max(initial=-1), fact_keys.max(initial=-1))) + 1
+        sales_by_key = np.bincount(sales_keys[valid], weights=sales_data['销售金额'].to_numpy()[valid], minlength=size)
+        facts['经销商销售额'] = np.where(fact_keys >= 0, sales_by_key[np.maximum(fact_keys, 0)], 0)
+
+        # 成本占比与分配销售额
+        month_cost = facts.groupby(['客户代码', '月份名'], observed=True)['物料成本'].transform('sum')
+        facts['成本占比'] = np.where(month_cost > 0, facts['物料成本'] / month_cost.where(month_cost > 0, 1), 0)
+        facts['分配销售额'] = facts['经销商销售额'] * facts['成本占比']
+        self.facts = facts
+        self.index = FilterIndex(facts, dims)
+
+    def rollup(self, by, filters=None):
+        """按 by 维度汇总物料成本和分配销售额，计算归因ROI
+
+        filters: {维度列: 取值列表}，与立方体筛选相同
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        facts = self.facts if not filters else self.facts[self.index.mask(filters)]
+        result = facts.groupby(by, observed=True)[['物料成本', '分配销售额']].sum().sort_index().reset_index()
+        result['ROI'] = np.where(result['物料成本'] > 0,
+                                 result['分配销售额'] / result['物料成本'].where(result['物料成本'] > 0, 1), 0)
+        return result
+
+
+def freeze_frame(df):
+    """将DataFrame数值、日期和分类编码列的底层数组设为只读，防止共享数据被原地修改
+
+    object列保持可写：pandas 1.5 的 object 比较内核要求可写缓冲区，只读会导致筛选报错。
+    分类列冻结整数编码数组，共享的类别字典本身不可变。
+    """
+    for col in df.columns:
+        if df[col].dtype == object:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            values = df[col].array.codes
+        else:
+            values = df[col].values
+        # 同类型列共用一个二维块，需要沿base向上把整块设为只读
+        while isinstance(values, np.ndarray):
+            values.flags.writeable = False
+            values = values.base
+    return df
+
+
+def select_facts(cube, distributor_data, distributor_index, filters=None):
+    """按侧边栏筛选条件求物料、销售和经销商数据的筛选结果
+
+    filters: {维度列: 取值列表}，未给出的维度不筛选。物料和销售立方体按区域、省份、月份、物料类别和销售人员筛选
+    （销售立方体没有物料类别，该条件不生效）；经销商数据按月份、经销商名称和销售人员筛选，
+    并且只保留筛选后销售数据中出现的经销商。
+    返回 (物料筛选, 销售筛选, 经销商筛选)，均为按需物化的 LazySelection
+    """
+    filters = filters or {}
+    cube_filters = {col: filters[col] for col in ['所属区域', '省份', '月份名', '物料类别', '销售人员']
+                    if col in filters}
+    material_selection = cube.select('material', cube_filters)
+    sales_selection = cube.select('sales', cube_filters)
+
+    distributor_filters = {col: filters[col] for col in ['月份名', '经销商名称', '销售人员'] if col in filters}
+    distributor_filters['客户代码'] = sales_selection.unique('客户代码')
+    distributor_selection = LazySelection(distributor_data, distributor_index.mask(distributor_filters))
+    return material_selection, sales_selection, distributor_selection
+
+
+class MonthPartition:
+    """单个月份的物料、销售和经销商数据，以及只含该月份的立方体和经销商筛选索引"""
+
+    def __init__(self, month, material_data, sales_data, distributor_data):
+        self.month = month
+        self.material_data = freeze_frame(material_data)
+        self.sales_data = freeze_frame(sales_data)
+        self.distributor_data = freeze_frame(distributor_data)
+        self.cube = MaterialCube(self.material_data, self.sales_data)
+        freeze_frame(self.cube.material)
+        freeze_frame(self.cube.sales)
+        self.distributor_index = FilterIndex(self.distributor_data, ['月份名', '经销商名称', '销售人员', '客户代码'])
+        self.nbytes = int(sum(df.memory_usage(deep=True).sum() for df in [
+            self.material_data, self.sales_data, self.distributor_data, self.cube.material, self.cube.sales
+        ]))
+
+    def select(self, filters=None):
+        """在该月份上筛选（月份条件已由分区满足，不再筛选）"""
+        filters = {col: values for col, values in (filters or {}).items() if col != '月份名'}
+        return select_facts(self.cube, self.distributor_data, self.distributor_index, filters)
+
+
+# 常驻内存的月份分区总大小上限（字节）
+PARTITION_CACHE_MAX_BYTES = 512 * 1024 ** 2
+
+
+class PartitionedDataset:
+    """按月份分区的数据集：常驻内存的是各月份的立方体和筛选索引
+
+    月份分区在首次访问时通过 loader(月份) 构建（从磁盘上的分区存储读取见 IncrementalStore.partitions，
+    从内存中的全量数据按月份取行见 from_frames），按最近使用顺序常驻内存，
+    总大小超过上限时淘汰最久未用的月份，之后再访问时重新加载。
+    各分区的维度列使用同一套分类字典，分区之间和与全量数据之间的编码一致。
+    """
+
+    def __init__(self, months, loader, max_bytes=PARTITION_CACHE_MAX_BYTES):
+        self.months = list(months)
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self._partitions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, material_data, sales_data, distributor_data, max_bytes=PARTITION_CACHE_MAX_BYTES):
+        """以内存中的全量数据为来源：按月份分组的行号只计算一次，加载分区时按行号取该月的行"""
+        frames = [material_data, sales_data, distributor_data]
+        rows = [df.groupby('月份名', observed=True, sort=False).indices for df in frames]
+        empty = np.array([], dtype=np.int64)
+
+        def loader(month):
+            return tuple(df.take(index.get(month, empty)).reset_index(drop=True) for df, index in zip(frames, rows))
+
+        months = sorted(set().union(*rows))
+        return cls(months, loader, max_bytes)
+
+    def __contains__(self, month):
+        return month in self.months
+
+    def partition(self, month):
+        """返回月份分区，不在内存中时加载，并按内存上限淘汰最久未用的分区"""
+        with self._lock:
+            if month in self._partitions:
+                self._partitions.move_to_end(month)
+                return self._partitions[month]
+
+        partition = MonthPartition(month, *self.loader(month))
+        with self._lock:
+            if month not in self._partitions:
+                self.loads += 1
+                self._partitions[month] = partition
+                self.nbytes += partition.nbytes
+                # 至少保留刚加载的分区
+                while self.nbytes > self.max_bytes and len(self._partitions) > 1:
+                    _, evicted = self._partitions.popitem(last=False)
+                    self.nbytes -= evicted.nbytes
+                    self.evictions += 1
+            return self._partitions[month]
+
+    def resident_months(self):
+        with self._lock:
+            return list(self._partitions)
+
+    def stats(self):
+        """分区缓存统计"""
+        return {
+            '月份数': len(self.months),
+            '常驻月份数': len(self._partitions),
+            '加载次数': self.loads,
+            '淘汰次数': self.evictions,
+            '内存占用(MB)': round(self.nbytes / 1024 ** 2, 2),
+            '内存上限(MB)': round(self.max_bytes / 1024 ** 2, 2)
+        }
+
+
+class DatasetStore:
+    """进程内共享的只读数据集
+
+    所有会话共享同一份物料、销售、价格和经销商数据，底层数组只读。
+    会话中需要追加派生列时，通过 session_view 获取浅拷贝后再修改，不影响共享数据。
+    跨月份的明细和立方体只用于趋势分析；按单个月份的筛选都在月份分区（PartitionedDataset）上进行，
+    分区可以覆盖跨月份数据之外的更早月份。
+    """
+
+    def __init__(self, material_data, sales_data, material_price, distributor_data, partitions=None):
+        self.material_data = freeze_frame(material_data)
+        self.sales_data = freeze_frame(sales_data)
+        self.material_price = freeze_frame(material_price)
+        self.distributor_data = freeze_frame(distributor_data)
+        # 加载时一次性构建预聚合立方体，各标签页查询立方体而非原始明细
+        self.cube = MaterialCube(self.material_data, self.sales_data)
+        freeze_frame(self.cube.material)
+        freeze_frame(self.cube.sales)
+        # 销售额归因明细同样在加载时构建一次，物料ROI和物料类别ROI都从中汇总
+        self.attribution = SalesAttribution(self.material_data, self.sales_data)
+        freeze_frame(self.attribution.facts)
+        # 经销商数据的筛选索引（立方体的索引在 MaterialCube 中构建）
+        self.distributor_index = FilterIndex(self.distributor_data, ['月份名', '经销商名称', '销售人员', '客户代码'])
+        # 月份分区（按需加载，超过内存上限时淘汰）；未给出时按月份切分上面的全量数据
+        self.partitions = partitions if partitions is not None else PartitionedDataset.from_frames(
+            self.material_data, self.sales_data, self.distributor_data)
+        # 数据集版本，数据重新加载后变化，用于区分缓存结果
+        self.version = f"{time.time_ns():x}"
+
+    @property
+    def months(self):
+        """全部可选月份（包括跨月份数据之外、只在分区中的月份），按月份排序"""
+        return self.partitions.months
+
+    def select(self, filters=None):
+        """按侧边栏筛选条件求物料、销售和经销商数据的筛选结果（见 select_facts）
+
+        只筛选单个月份时在该月份分区的立方体上求位图；不限月份或选择多个月份（趋势分析）时在全量立方体上筛选。
+        """
+        filters = filters or {}
+        months = filters.get('月份名')
+        if months is not None and len(months) == 1 and months[0] in self.partitions:
+            return self.partitions.partition(months[0]).select(filters)
+        return select_facts(self.cube, self.distributor_data, self.distributor_index, filters)
+
+    def frames(self):
+        """返回共享的只读数据（不可追加列或原地修改）"""
+        return self.material_data, self.sales_data, self.material_price, self.distributor_data
+
+    def session_view(self):
+        """返回供单个会话使用的浅拷贝视图
+
+        视图与共享数据共用底层只读数组，不复制数据；在视图上新增或替换列只影响当前会话。
+        """
+        return tuple(df.copy(deep=False) for df in self.frames())
+
+
+# 计算结果缓存的内存上限（字节）
+RESULT_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+
+class ResultCache:
+    """按筛选指纹缓存的计算结果
+
+    键为 (计算名称, 指纹)，指纹由数据集版本和该计算依赖的筛选条件生成，筛选条件不变时直接复用结果。
+    按最近使用顺序维护，总内存超过上限时从最久未使用的结果开始淘汰。
+    结果在所有会话间共享，调用方不应原地修改。
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(version, selection=None):
+        """数据集版本和筛选条件的稳定指纹（多选条件与选择顺序无关）"""
+        normalized = {
+            col: sorted(map(str, values)) if isinstance(values, (list, tuple)) else str(values)
+            for col, values in (selection or {}).items()
+        }
+        payload = json.dumps([version, normalized], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(deep=True))
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(ResultCache._sizeof(item) for item in value)
+        return sys.getsizeof(value)
+
+    def get_or_compute(self, name, fingerprint, compute):
+        """命中时返回缓存结果，否则计算、写入缓存并按内存上限淘汰"""
+        key = (name, fingerprint)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = self._sizeof(value)
+        with self._lock:
+            # 单个结果超过上限时不缓存
+            if size <= self.max_bytes:
+                if key in self._entries:
+                    self.nbytes -= self._entries.pop(key)[1]
+                self._entries[key] = (value, size)
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.nbytes -= evicted_size
+                    self.evictions += 1
+        return value
+
+    def stats(self):
+        """命中、未命中、淘汰次数和内存占用"""
+        return {
+            '命中': self.hits,
+            '未命中': self.misses,
+            '淘汰': self.evictions,
+            '缓存条目': len(self._entries),
+            '内存占用(MB)': round(self.nbytes / 1024 ** 2, 2),
+            '内存上限(MB)': round(self.max_bytes / 1024 ** 2, 2)
+        }
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_analytics import DatasetStore, generate_sample_data  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def sample_frames():
+    """小规模示例数据：(物料数据, 销售数据, 物料单价, 经销商数据)"""
+    return generate_sample_data(num_customers=40, num_months=6, num_materials=12)
+
+
+@pytest.fixture(scope='session')
+def store(sample_frames):
+    return DatasetStore(*sample_frames)
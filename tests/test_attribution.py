@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from material_analytics import compute_category_roi, compute_material_roi
+
+
+def per_row_allocation(material_data, sales_data):
+    """逐行分配的参照实现：每条物料记录按其在经销商当月物料总成本中的占比分得该经销商当月销售额"""
+    rows = material_data[['客户代码', '月份名', '产品代码', '物料类别', '物料成本']].astype({
+        '客户代码': object, '月份名': object, '产品代码': object, '物料类别': object})
+    sales = sales_data.astype({'客户代码': object, '月份名': object}).groupby(
+        ['客户代码', '月份名'])['销售金额'].sum().rename('经销商销售额').reset_index()
+    rows = rows.merge(sales, on=['客户代码', '月份名'], how='left').fillna({'经销商销售额': 0})
+    month_cost = rows.groupby(['客户代码', '月份名'])['物料成本'].transform('sum')
+    rows['分配销售额'] = np.where(month_cost > 0, rows['经销商销售额'] * rows['物料成本'] / month_cost, 0)
+    return rows
+
+
+def reference_roi(rows, by):
+    totals = rows.groupby(by)[['物料成本', '分配销售额']].sum()
+    totals = totals[totals['物料成本'] > 0]
+    return totals['分配销售额'] / totals['物料成本']
+
+
+def test_material_roi_matches_per_row_allocation(store):
+    rows = per_row_allocation(store.material_data, store.sales_data)
+    expected = reference_roi(rows, '产品代码').round(2)
+    result = compute_material_roi(store.attribution).set_index('产品代码')['物料ROI']
+    result.index = result.index.astype(object)
+    pd.testing.assert_series_equal(result.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_category_roi_matches_per_row_allocation(store):
+    rows = per_row_allocation(store.material_data, store.sales_data)
+    expected = reference_roi(rows, '物料类别')
+    result = compute_category_roi(store.attribution).set_index('物料类别')['类别ROI']
+    result.index = result.index.astype(object)
+    pd.testing.assert_series_equal(result.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_filtered_roi_matches_per_row_allocation(store):
+    months = sorted(store.material_data['月份名'].unique())[-2:]
+    regions = sorted(store.material_data['所属区域'].unique())[:2]
+    filters = {'月份名': months, '所属区域': regions}
+    mask = store.material_data['月份名'].isin(months) & store.material_data['所属区域'].isin(regions)
+    # 筛选只决定汇总哪些行，分配仍以经销商当月全部物料成本为分母
+    rows = per_row_allocation(store.material_data, store.sales_data)[mask.to_numpy()]
+    expected = reference_roi(rows, '物料类别')
+    result = compute_category_roi(store.attribution, filters).set_index('物料类别')['类别ROI']
+    result.index = result.index.astype(object)
+    pd.testing.assert_series_equal(result.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_allocation_conserves_sales(store):
+    rows = per_row_allocation(store.material_data, store.sales_data)
+    allocated = store.attribution.facts['分配销售额'].sum()
+    assert allocated == pytest.approx(rows['分配销售额'].sum())
+    # 有物料投入的经销商-月份，销售额全部分配
+    invested = rows.groupby(['客户代码', '月份名'])['经销商销售额'].first()
+    assert allocated == pytest.approx(invested.sum())
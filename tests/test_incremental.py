@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+from material_analytics import IncrementalStore, generate_sample_data, process_data
+
+DERIVED_COLUMNS = ['月份', '年份', '月份名', '季度', '月度名称']
+
+
+@pytest.fixture(scope='module')
+def raw_frames():
+    """示例数据去掉派生列，还原为读取 Excel 后的原始明细"""
+    material_data, sales_data, material_price, _ = generate_sample_data(num_customers=30, num_months=4)
+    frames = []
+    for df in [material_data, sales_data]:
+        df = df.drop(columns=DERIVED_COLUMNS)
+        frames.append(df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}))
+    return frames[0], frames[1], material_price
+
+
+def test_first_append_requires_price_table(tmp_path, raw_frames):
+    material_data, sales_data, _ = raw_frames
+    with pytest.raises(ValueError, match='物料单价表'):
+        IncrementalStore(str(tmp_path)).append(material_data, sales_data)
+
+
+def test_append_matches_full_processing(tmp_path, raw_frames):
+    material_data, sales_data, material_price = raw_frames
+    last_month = material_data['发运月份'].max()
+    store = IncrementalStore(str(tmp_path))
+    store.append(material_data[material_data['发运月份'] < last_month],
+                 sales_data[sales_data['发运月份'] < last_month], material_price)
+    store.append(material_data[material_data['发运月份'] == last_month],
+                 sales_data[sales_data['发运月份'] == last_month])
+
+    _, _, _, expected = process_data(material_data.copy(), sales_data.copy(), material_price.copy())
+    pd.testing.assert_frame_equal(store.load()[3], expected)
+    # 分层阈值只依赖一个汇总文件，不再按月份保存汇总分区
+    assert os.path.exists(tmp_path / 'summary.parquet')
+    assert not os.path.exists(tmp_path / 'summary')
+
+
+def test_reimport_replaces_month(tmp_path, raw_frames):
+    material_data, sales_data, material_price = raw_frames
+    last_month = material_data['发运月份'].max()
+    store = IncrementalStore(str(tmp_path))
+    store.append(material_data, sales_data, material_price)
+    first = store.load()
+
+    # 重复导入最后一个月：行数和汇总不变
+    store.append(material_data[material_data['发运月份'] == last_month],
+                 sales_data[sales_data['发运月份'] == last_month])
+    again = IncrementalStore(str(tmp_path)).load()
+    for before, after in zip(first, again):
+        pd.testing.assert_frame_equal(before, after)
+
+
+def test_reimport_of_one_table_keeps_other(tmp_path, raw_frames):
+    material_data, sales_data, material_price = raw_frames
+    last_month = material_data['发运月份'].max()
+    store = IncrementalStore(str(tmp_path))
+    store.append(material_data, sales_data, material_price)
+
+    # 只重新导入最后一个月的销售明细（减半），物料明细保留
+    halved = sales_data[sales_data['发运月份'] == last_month].iloc[::2]
+    store.append(material_data.iloc[0:0], halved)
+    expected_sales = pd.concat([sales_data[sales_data['发运月份'] < last_month], halved])
+    _, _, _, expected = process_data(material_data.copy(), expected_sales.copy(), material_price.copy())
+    material, sales, _, distributor = store.load()
+    assert len(material) == len(material_data)
+    assert len(sales) == len(expected_sales)
+    pd.testing.assert_frame_equal(distributor, expected)
@@ -0,0 +1,116 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from material_analytics import compute_product_bundles, mine_frequent_itemsets
+
+# 10个篮子，项目 0-4；{0,1,2} 出现3次、{0,1,2,3} 出现2次，覆盖3项和4项组合
+BASKETS = [
+    {0, 1, 2, 3},
+    {0, 1, 2, 3},
+    {0, 1, 2},
+    {0, 1},
+    {0, 2, 4},
+    {1, 2},
+    {3, 4},
+    {4},
+    {0, 3},
+    set(),
+]
+ROI = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0])
+
+
+def brute_force(baskets, roi, min_support, max_k):
+    """穷举所有不超过 max_k 项的组合，逐篮子计数"""
+    items = sorted(set().union(*baskets))
+    expected = {}
+    for k in range(1, max_k + 1):
+        for itemset in combinations(items, k):
+            owners = [i for i, basket in enumerate(baskets) if set(itemset) <= basket]
+            if len(owners) >= min_support:
+                expected[itemset] = (len(owners), float(roi[owners].sum()))
+    return expected
+
+
+def mine(baskets, roi, min_support, max_k):
+    pairs = [(b, item) for b, basket in enumerate(baskets) for item in sorted(basket)]
+    basket_ids = np.array([b for b, _ in pairs], dtype=np.int64)
+    item_ids = np.array([item for _, item in pairs], dtype=np.int64)
+    n_items = int(item_ids.max()) + 1
+    result = mine_frequent_itemsets(basket_ids, item_ids, n_items, roi, min_support, max_k=max_k)
+    return {itemset: (count, roi_sum) for itemset, count, roi_sum in result}
+
+
+@pytest.mark.parametrize('min_support', [1, 2, 3, 4, 6, 11])
+@pytest.mark.parametrize('max_k', [1, 2, 3, 4])
+def test_itemsets_match_brute_force(min_support, max_k):
+    result = mine(BASKETS, ROI, min_support, max_k)
+    expected = brute_force(BASKETS, ROI, min_support, max_k)
+    assert result.keys() == expected.keys()
+    for itemset, (count, roi_sum) in expected.items():
+        assert result[itemset][0] == count
+        assert result[itemset][1] == pytest.approx(roi_sum)
+
+
+def test_min_support_boundary():
+    # {0,1,2} 恰好出现3次：支持数等于阈值时保留，阈值加1时剔除
+    assert (0, 1, 2) in mine(BASKETS, ROI, 3, 3)
+    assert (0, 1, 2) not in mine(BASKETS, ROI, 4, 3)
+    assert mine(BASKETS, ROI, 2, 4)[(0, 1, 2, 3)] == (2, pytest.approx(3.0))
+
+
+def test_unordered_input_pairs():
+    pairs = [(b, item) for b, basket in enumerate(BASKETS) for item in basket]
+    rng = np.random.default_rng(0)
+    pairs = [pairs[i] for i in rng.permutation(len(pairs))]
+    basket_ids = np.array([b for b, _ in pairs], dtype=np.int64)
+    item_ids = np.array([item for _, item in pairs], dtype=np.int64)
+    result = mine_frequent_itemsets(basket_ids, item_ids, 5, ROI, 2, max_k=3)
+    assert {itemset: count for itemset, count, _ in result} == {
+        itemset: count for itemset, (count, _) in brute_force(BASKETS, ROI, 2, 3).items()}
+
+
+def basket_frames():
+    """按 BASKETS 构造物料和经销商数据：每个篮子是一个经销商的一个月"""
+    codes = [f'P{item}' for item in range(5)]
+    material_rows, distributor_rows = [], []
+    for b, basket in enumerate(BASKETS):
+        customer, month = f'C{b // 2}', f'2024-0{b % 2 + 1}'
+        for item in sorted(basket):
+            # 同一篮子中的重复物料记录只计一次
+            material_rows += [(customer, month, codes[item], f'产品{item}')] * (2 if item == 0 else 1)
+        distributor_rows.append((customer, month, ROI[b]))
+    material = pd.DataFrame(material_rows, columns=['客户代码', '月份名', '产品代码', '产品名称'])
+    distributor = pd.DataFrame(distributor_rows, columns=['客户代码', '月份名', 'ROI'])
+    customers = pd.CategoricalDtype(sorted(distributor['客户代码'].unique()))
+    months = pd.CategoricalDtype(['2024-01', '2024-02'])
+    for df in (material, distributor):
+        df['客户代码'] = df['客户代码'].astype(customers)
+        df['月份名'] = df['月份名'].astype(months)
+    material['产品代码'] = material['产品代码'].astype(pd.CategoricalDtype(codes))
+    return material, distributor
+
+
+def test_product_bundles_match_brute_force():
+    material, distributor = basket_frames()
+    # 空篮子不会出现在物料数据中，篮子数为9
+    baskets = [basket for basket in BASKETS if basket]
+    roi = ROI[[b for b, basket in enumerate(BASKETS) if basket]]
+    min_count = int(np.ceil(0.3 * len(baskets)))
+    expected = {itemset: value for itemset, value in brute_force(baskets, roi, min_count, 3).items()
+                if len(itemset) >= 2}
+
+    bundles = compute_product_bundles(material, distributor, min_support=0.3, max_k=3)
+    result = {tuple(int(code[1:]) for code in row['组合']): row for _, row in bundles.iterrows()}
+    assert result.keys() == expected.keys()
+    item_support = {item: sum(item in basket for basket in baskets) / len(baskets) for item in range(5)}
+    for itemset, (count, roi_sum) in expected.items():
+        row = result[itemset]
+        assert row['支持数'] == count
+        assert row['项数'] == len(itemset)
+        assert row['支持度'] == pytest.approx(count / len(baskets))
+        assert row['平均ROI'] == pytest.approx(roi_sum / count)
+        assert row['提升度'] == pytest.approx(count / len(baskets) / np.prod([item_support[i] for i in itemset]))
+    assert bundles['提升度'].is_monotonic_decreasing
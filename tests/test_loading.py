@@ -0,0 +1,64 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from material_analytics.loading import read_excel_streaming
+
+openpyxl = pytest.importorskip('openpyxl')
+
+HEADER = ['代码', '数量', '单价', '日期', '备注', '混合', '编号', '标记', '空列', '数量', None, '末列']
+ROWS = [
+    ['A01', 1, 1.5, datetime.datetime(2024, 1, 1), '首行', 1, '001', True, None, 10, 'x', 1],
+    ['A02', 2, 2.0, datetime.datetime(2024, 2, 1), 'NA', 'x', '002', False, None, 11, None, 2],
+    None,
+    ['003', 3, None, None, None, 2.5, '003', None, None, 12, 'y', 3],
+    ['A04', None, 4.25, datetime.datetime(2024, 4, 1), 'N/A', None, '010', True, None, 13, None, 4],
+    None,
+    None,
+    ['A05', 5, 5.0, datetime.datetime(2024, 5, 1), '末行', '7', '011', False, None, 14, 'z', 5],
+    None,
+]
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    path = tmp_path_factory.mktemp('excel') / 'fixture.xlsx'
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in ROWS:
+        ws.append(row if row is not None else [None] * len(HEADER))
+    # 第二个工作表：只有表头
+    wb.create_sheet('空表').append(['甲', '乙'])
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize('block_rows', [1, 2, 3, 10_000])
+def test_matches_read_excel(workbook, block_rows):
+    expected = pd.read_excel(workbook)
+    result = read_excel_streaming(workbook, block_rows=block_rows)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_keeps_interior_blank_rows(workbook):
+    result = read_excel_streaming(workbook, block_rows=2)
+    assert len(result) == 8
+    assert result.iloc[[2, 5, 6]].isna().all().all()
+
+
+def test_digit_strings_follow_column_inference(workbook):
+    result = read_excel_streaming(workbook, block_rows=2)
+    # 整列都是数字文本时转为数值（含空值为 float64）；与字母代码混在一列时保留文本
+    assert result['编号'].dtype == 'float64'
+    assert result['编号'].dropna().tolist() == [1, 2, 3, 10, 11]
+    assert result['代码'].dropna().tolist() == ['A01', 'A02', '003', 'A04', 'A05']
+    # 默认缺失值标记记为缺失
+    assert result['备注'].isna().sum() == 6
+
+
+def test_empty_sheet(workbook):
+    result = read_excel_streaming(workbook, sheet_name='空表')
+    expected = pd.read_excel(workbook, sheet_name='空表')
+    pd.testing.assert_frame_equal(result, expected, check_index_type=False)
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from material_analytics import PrecomputedResults, compute_category_cost, compute_kpis, compute_material_roi, precompute
+
+
+@pytest.fixture(scope='module')
+def results(store, tmp_path_factory):
+    output = str(tmp_path_factory.mktemp('precompute') / 'precomputed')
+    summary, _ = precompute(store, output, dimensions=['所属区域', '物料类别'], workers=1)
+    return PrecomputedResults.open(output), summary
+
+
+def all_selected(store, month):
+    selection = {col: sorted(store.cube.material[col].unique())
+                 for col in ['所属区域', '省份', '物料类别', '销售人员']}
+    selection['月份名'] = month
+    return selection
+
+
+def test_dataset_metrics_only_on_all_slice(results):
+    precomputed, summary = results
+    sliced = summary[summary['维度'] != '全部']
+    assert sliced['物料ROI'].isna().all()
+    assert sliced['关键指标'].notna().all()
+    assert precomputed.resolve('物料ROI', {}) == ('全部', '全部')
+    assert precomputed.resolve('物料ROI', {'所属区域': ['华东']}) is None
+
+
+def test_sliced_metric_matches_dashboard(store, results):
+    precomputed, _ = results
+    month = precomputed.manifest['month']
+    category = sorted(store.cube.material['物料类别'].unique())[0]
+    selection = {**all_selected(store, month), '物料类别': [category]}
+
+    material, sales, _ = store.select({**selection, '月份名': [month]})
+    expected = compute_category_cost(material.frame)
+    pd.testing.assert_frame_equal(precomputed.lookup('物料类别投入', selection), expected,
+                                  check_dtype=False, check_categorical=False)
+
+    kpis = precomputed.lookup('关键指标', selection)
+    pd.testing.assert_frame_equal(kpis, compute_kpis(material, sales), check_dtype=False)
+
+
+def test_other_month_misses(store, results):
+    precomputed, _ = results
+    months = sorted(store.cube.material['月份名'].unique())
+    assert precomputed.lookup('关键指标', all_selected(store, months[0])) is None
+
+
+def test_dataset_metric_matches_dashboard(store, results):
+    precomputed, _ = results
+    pd.testing.assert_frame_equal(precomputed.lookup('物料ROI', {}), compute_material_roi(store.attribution),
+                                  check_dtype=False, check_categorical=False)
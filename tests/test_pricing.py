@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from material_analytics import PRICE_EFFECTIVE_COLUMN, IncrementalStore, PriceHistory, generate_sample_data, process_data
+
+DERIVED_COLUMNS = ['月份', '年份', '月份名', '季度', '月度名称']
+
+MONTHS = pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01', '2024-05-01'])
+
+
+def price_table(rows):
+    return pd.DataFrame(rows, columns=['物料代码', '单价（元）', '物料类别', PRICE_EFFECTIVE_COLUMN])
+
+
+def shipments(code):
+    return pd.DataFrame({'产品代码': code, '发运月份': MONTHS, '求和项:数量（箱）': 2})
+
+
+def test_price_change_mid_history():
+    prices = PriceHistory.from_table(price_table([
+        ('M1', 10.0, '促销物料', pd.NaT),
+        ('M1', 20.0, '促销物料', pd.Timestamp('2024-03-15')),
+    ]))
+    result = prices.apply(shipments('M1'))
+    assert result['单价（元）'].tolist() == [10, 10, 20, 20, 20]
+    assert result['物料成本'].tolist() == [20, 20, 40, 40, 40]
+
+
+def test_lookup_before_first_effective_month():
+    prices = PriceHistory.from_table(price_table([
+        ('M1', 5.0, '赠品', pd.Timestamp('2024-01-01')),
+        ('M2', 30.0, '陈列物料', pd.Timestamp('2024-03-01')),
+        ('M2', 40.0, '宣传物料', pd.Timestamp('2024-05-01')),
+        ('M3', 7.0, '赠品', pd.Timestamp('2024-01-01')),
+    ]))
+    # 早于最早生效月份时沿用最早的版本，不会取到相邻物料的单价
+    result = prices.apply(shipments('M2'))
+    assert result['单价（元）'].tolist() == [30, 30, 30, 30, 40]
+    assert result['物料类别'].tolist() == ['陈列物料'] * 4 + ['宣传物料']
+
+
+def test_duplicate_codes_last_row_wins():
+    prices = PriceHistory.from_table(price_table([
+        ('M1', 10.0, '促销物料', pd.NaT),
+        ('M2', 50.0, '赠品', pd.NaT),
+        ('M1', 12.0, '陈列物料', pd.NaT),
+        ('M1', 30.0, '促销物料', pd.Timestamp('2024-04-01')),
+        ('M1', 35.0, '宣传物料', pd.Timestamp('2024-04-01')),
+    ]))
+    result = prices.apply(shipments('M1'))
+    assert result['单价（元）'].tolist() == [12, 12, 12, 35, 35]
+    assert result['物料类别'].tolist() == ['陈列物料'] * 3 + ['宣传物料'] * 2
+
+
+def test_unknown_material_uses_mean_price():
+    table = price_table([('M1', 10.0, '促销物料', pd.NaT), ('M2', 30.0, '赠品', pd.NaT)])
+    result = PriceHistory.from_table(table).apply(shipments('M9'))
+    assert result['单价（元）'].tolist() == [20] * 5
+    assert result['物料代码'].isna().all()
+    assert result['物料类别'].isna().all()
+
+
+def test_changed_materials_and_affected_rows():
+    previous = PriceHistory.from_table(price_table([('M1', 10.0, '促销物料', pd.NaT), ('M2', 30.0, '赠品', pd.NaT)]))
+    prices = PriceHistory.from_table(price_table([
+        ('M1', 10.0, '促销物料', pd.NaT),
+        ('M1', 15.0, '促销物料', pd.Timestamp('2024-04-01')),
+        ('M2', 30.0, '赠品', pd.NaT),
+    ]))
+    changes = prices.changed_materials(previous)
+    assert list(changes) == ['M1']
+    assert changes['M1'] == 2024 * 12 + 3
+
+    # 平均单价也变化：单价表中没有的物料（按平均单价填充）同样受影响
+    material = pd.concat([shipments('M1'), shipments('M2'), shipments('M9')], ignore_index=True)
+    rows = prices.affected_rows(material, previous, changes)
+    np.testing.assert_array_equal(rows, [3, 4, 10, 11, 12, 13, 14])
+
+    # 只重算受影响的行，结果与全部重算一致
+    partial = previous.apply(material.copy())
+    prices.apply(partial, rows)
+    pd.testing.assert_frame_equal(partial, prices.apply(material.copy()))
+
+
+def test_reprice_rewrites_only_affected_months(tmp_path):
+    material_data, sales_data, material_price, _ = generate_sample_data(num_customers=20, num_months=5, seed=7)
+    # 去掉示例数据中已算好的单价和成本列，导入时按单价表计算
+    material_data = material_data.drop(columns=['物料类别', '单价（元）', '物料成本'])
+    raw = []
+    for df in (material_data, sales_data):
+        df = df.drop(columns=DERIVED_COLUMNS)
+        raw.append(df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}))
+    material_data, sales_data = raw
+    store = IncrementalStore(str(tmp_path))
+    store.append(material_data, sales_data, material_price)
+    mtimes = {month: os.stat(store.partition_path('material', month)).st_mtime_ns for month in store.months}
+
+    # 一个物料从倒数第二个月起涨价
+    code = material_price['物料代码'].iloc[0]
+    effective = sorted(material_data['发运月份'].unique())[-2]
+    new_price = pd.concat([
+        material_price.assign(**{PRICE_EFFECTIVE_COLUMN: pd.NaT}),
+        material_price.head(1).assign(**{'单价（元）': material_price['单价（元）'].iloc[0] * 2,
+                                         PRICE_EFFECTIVE_COLUMN: effective})
+    ], ignore_index=True)
+    report = store.reprice(new_price)
+
+    used = material_data.loc[material_data['产品代码'] == code, '发运月份']
+    expected_months = [month for month in store.months
+                       if pd.Timestamp(month) >= effective and (used.dt.to_period('M') == pd.Period(month)).any()]
+    assert expected_months
+    assert report['重算月份'] == expected_months
+    assert report['重算物料行数'] == int((used >= effective).sum())
+    for month in store.months:
+        changed = os.stat(store.partition_path('material', month)).st_mtime_ns != mtimes[month]
+        assert changed == (month in expected_months)
+
+    _, _, _, expected = process_data(material_data.copy(), sales_data.copy(), new_price.copy())
+    pd.testing.assert_frame_equal(store.load()[3], expected)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from material_analytics import (
+    DatasetStore, DistributorIndex, FilterIndex, LazySelection, PartitionedDataset, select_facts
+)
+
+
+def isin_mask(df, filters):
+    """旧实现：逐维度 isin 求交"""
+    mask = pd.Series(True, index=df.index)
+    for col, values in filters.items():
+        mask &= df[col].isin(values)
+    return mask.to_numpy()
+
+
+def filter_cases(df):
+    regions = sorted(df['所属区域'].unique())
+    months = sorted(df['月份名'].unique())
+    categories = sorted(df['物料类别'].unique())
+    return [
+        {},
+        {'所属区域': regions},
+        {'所属区域': regions[:2]},
+        {'所属区域': regions[:1], '月份名': months[-1:]},
+        {'所属区域': regions[1:3], '物料类别': categories[:2], '月份名': months[:3]},
+        {'所属区域': []},
+        {'所属区域': ['不存在的区域']},
+        {'所属区域': regions, '物料类别': categories[:1] + ['不存在的类别']},
+    ]
+
+
+def test_filter_index_matches_isin(store):
+    cube = store.cube.material
+    index = FilterIndex(cube, store.cube.DIMENSIONS)
+    for filters in filter_cases(cube):
+        np.testing.assert_array_equal(index.mask(filters), isin_mask(cube, filters), err_msg=str(filters))
+
+
+def test_filter_index_on_object_columns():
+    df = pd.DataFrame({'区域': ['东', '西', None, '东', '南'], '值': range(5)})
+    index = FilterIndex(df, ['区域'])
+    for values in [['东'], ['东', '西', '南'], [], ['北']]:
+        np.testing.assert_array_equal(index.mask({'区域': values}), df['区域'].isin(values).to_numpy())
+    np.testing.assert_array_equal(index.rows('区域', '东'), [0, 3])
+
+
+@pytest.mark.parametrize('case', range(8))
+def test_lazy_selection_matches_boolean_filter(store, case):
+    cube = store.cube.material
+    filters = filter_cases(cube)[case]
+    expected = cube[isin_mask(cube, filters)]
+    selection = store.cube.select('material', filters)
+
+    assert len(selection) == len(expected)
+    assert selection.sum('物料成本') == pytest.approx(expected['物料成本'].sum())
+    assert selection.nunique('经销商名称') == expected['经销商名称'].nunique()
+    pd.testing.assert_frame_equal(selection.frame.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_lazy_selection_empty_mask(store):
+    cube = store.cube.material
+    selection = LazySelection(cube, np.zeros(len(cube), dtype=bool))
+    assert len(selection) == 0
+    assert selection.sum('物料成本') == 0
+    assert selection.nunique('经销商名称') == 0
+    assert selection.frame.empty
+    assert list(selection.frame.columns) == list(cube.columns)
+
+
+def test_distributor_index_matches_boolean_filter(sample_frames):
+    material_data, _, _, _ = sample_frames
+    # 打乱行序，覆盖需要先排序的情况
+    shuffled = material_data.sample(frac=1, random_state=0)
+    codes = sorted(material_data['客户代码'].unique())
+    for df in (material_data, shuffled):
+        index = DistributorIndex(df)
+        for values in [codes[0], codes[-1], codes[:3], [codes[5], '不存在的代码'], [], '不存在的代码']:
+            wanted = values if isinstance(values, list) else [values]
+            expected = df[df['客户代码'].isin(wanted)]
+            result = index.rows(values)
+            assert len(result) == len(expected)
+            pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+
+def test_distributor_index_with_mask(store):
+    cube = store.cube.material
+    months = sorted(cube['月份名'].unique())
+    codes = sorted(cube['客户代码'].unique())
+    selection = store.cube.select('material', {'月份名': months[-2:]})
+    for values in [codes[0], codes[1:4], []]:
+        wanted = values if isinstance(values, list) else [values]
+        expected = cube[selection.mask & cube['客户代码'].isin(wanted).to_numpy()]
+        pd.testing.assert_frame_equal(selection.rows(values).sort_index(), expected.sort_index())
+
+
+def test_distributor_index_skips_missing_codes():
+    df = pd.DataFrame({'客户代码': ['B', None, 'A', 'B', None], '值': range(5)})
+    index = DistributorIndex(df)
+    assert None not in index
+    assert list(index.rows('B')['值']) == [0, 3]
+    assert list(index.rows(['A', 'B'])['值']) == [2, 0, 3]
+
+
+def summarize(selections):
+    material, sales, distributors = selections
+    return (material.sum('物料成本'), sales.sum('销售金额'), sales.nunique('经销商名称'),
+            len(distributors.frame), distributors.sum('销售总额'))
+
+
+def test_single_month_views_use_partitions(store):
+    months = store.months
+    assert months == sorted(store.cube.material['月份名'].unique())
+    regions = sorted(store.cube.material['所属区域'].unique())
+    for month in [months[0], months[-1]]:
+        for filters in [{'月份名': [month]}, {'月份名': [month], '所属区域': regions[:2], '物料类别': []}]:
+            before = store.partitions.loads
+            actual = summarize(store.select(filters))
+            expected = summarize(select_facts(store.cube, store.distributor_data, store.distributor_index, filters))
+            assert actual == pytest.approx(expected)
+            assert store.partitions.loads - before <= 1
+    assert set(store.partitions.resident_months()) >= {months[0], months[-1]}
+
+
+def test_multi_month_views_use_full_cube(store):
+    months = store.months[-2:]
+    material, _, _ = store.select({'月份名': months})
+    assert material.df is store.cube.material
+
+
+def test_partition_outside_trend_frames(sample_frames):
+    # 跨月份数据只含最近两个月，更早的月份仍可从分区选择
+    material_data, sales_data, material_price, distributor_data = sample_frames
+    partitions = PartitionedDataset.from_frames(material_data, sales_data, distributor_data)
+    recent = sorted(material_data['月份名'].unique())[-2:]
+    trend = [df[df['月份名'].isin(recent)].reset_index(drop=True) for df in (material_data, sales_data)]
+    trend_distributors = distributor_data[distributor_data['月份名'].isin(recent)].reset_index(drop=True)
+    store = DatasetStore(trend[0], trend[1], material_price, trend_distributors, partitions=partitions)
+
+    month = store.months[0]
+    assert month not in recent
+    material, sales, distributors = store.select({'月份名': [month]})
+    assert material.sum('物料成本') == pytest.approx(
+        material_data.loc[material_data['月份名'] == month, '物料成本'].sum())
+    assert len(distributors.frame) == (distributor_data['月份名'] == month).sum()
+
+
+def test_partitions_evict_over_limit(sample_frames):
+    material_data, sales_data, _, distributor_data = sample_frames
+    partitions = PartitionedDataset.from_frames(material_data, sales_data, distributor_data, max_bytes=1)
+    for month in partitions.months:
+        partitions.partition(month)
+    assert partitions.resident_months() == [partitions.months[-1]]
+    assert partitions.evictions == len(partitions.months) - 1